@@ -4,17 +4,30 @@
 # the player engages with various chosen AI strategies
 # to score points over a randomly determined number of
 # rounds to either win, lose, or tie the game.
-# It also utilizes the graphics.py module, which is in the folder.
+# It also utilizes the graphics.py module, which is in the folder, and
+# plays each match through the headless engine in engine.py.
 # By: Chait Sayani and Trevor Hughes 
 
+import sys
+import time
+from contextlib import nullcontext
 from random import *
 from graphics import *
+from engine import PAYOFFS, Match
+from matchlog import MatchLog, MatchLogWriter
+from profiling import Profiler
+from scorestore import HUMAN, ScoreStore
+import strategies
 
 class Game:
 
-    def __init__(self):
+    def __init__(self, seed=None, store=None, log=None, payoffs=PAYOFFS, profiler=None):
         """ establishes many key variables to be used throughout the class
-        in various functions or respective AI strategies """
+        in various functions or respective AI strategies. A seed can be given
+        to replay the same random choices, and the results of the game are
+        kept in the given score store and written to the given match log.
+        Matches are scored with the given payoff matrix, and the phases of
+        each turn are timed by the given profiler """
 
         # creates the window and various lists that hold objects and text that
         # are drawn to the program throughout the course of the game 
@@ -25,31 +38,31 @@ class Game:
         self.objectList = []
         self.startText = []
         self.endingText = []
+        self.scoreWidgets = []
         self.strategy = 0
-
-        # creates two lists to store both the player and bot moves and
-        # intializes player score and bot score to zero 
-        self.playerHistory = []
-        self.botHistory = []
-        self.playerScore = 0
-        self.botScore = 0
-        self.playerMove = ""
-        self.botMove = ""
-        self.payoff = 0
-
-        # sets the number of runs randomly between 1 and 50 and intializes
-        # variables that count and interact with the runs
-        self.runs = randint(6, 20)
-        self.randCount = 1
-        self.randMoves = randint(1, self.runs)
-        self.grudge = False
+        self.store = store
+        self.log = log
+        self.payoffs = payoffs
+        self.profiler = profiler
+        self.newMatch(seed)
+
+    def newMatch(self, seed=None):
+        """ sets up a new match against the bot in the same window, so that the
+        screens drawn for the previous match can be shown again rather than rebuilt """
+
+        # sets the number of runs randomly between 6 and 20 and creates the match
+        # engine, which keeps both move histories and scores and plays the bot's
+        # AI strategies. The player's moves come from their clicks. All of the
+        # game's random choices come from its own generator rather than the
+        # shared one in the random module. The seed is picked here when none is
+        # given so that it can be recorded with the result
+        if seed is None:
+            seed = randrange(2**32)
+        self.seed = seed
+        self.rng = Random(seed)
+        self.runs = self.rng.randint(6, 20)
+        self.match = Match(None, None, self.runs, self.payoffs, rng=self.rng)
         self.turn = 0
-        self.round = 1
-
-        # initializes variables that will calculate the average score for each
-        # type of move to be used in the adaptive AI 
-        self.cAvg = []
-        self.dAvg = []
         self.strat = ""
 
     def instructions(self):
@@ -68,27 +81,28 @@ class Game:
         playButton.setFill("gold2")
         self.instructionText.append(Text(Point(350, 550), "Ready?"))
 
-        # draws the play button and colors the intruction text 
-        playButton.draw(self.window)
+        # colors the intruction text and draws it with the play button in a single frame
         textColors = ["cyan4", "firebrick4", "DarkSeaGreen4", "DarkSeaGreen4", "black"]
         for t in range(len(self.instructionText)):
             self.instructionText[t].setSize(25)
             self.instructionText[t].setFill(textColors[t])
-            self.instructionText[t].draw(self.window)
+        self.window.drawGroup("instructionScreen", [playButton] + self.instructionText)
 
         # waits for the user to click on the button and then erases the instructions
-        click1 = self.window.getMouse()
-        while not 300 <= click1.x <= 400 or not 500 <= click1.y <= 600:
-            click1 = self.window.getMouse()
+        region = self.window.addRegion(playButton, True)
+        self.window.getRegion()
+        self.window.removeRegion(region)
 
-        playButton.undraw()
-        for t in self.instructionText:
-            t.undraw()
+        # the instructions are only shown once, so they are deleted rather than hidden
+        self.window.undrawTag("instructionScreen")
 
     def buttons(self):
         """ creates a start screen they introduces the player to the 
-        game and lets them choose the strategy they wish to face """
-        startWin = self.window
+        game and lets them choose the strategy they wish to face. The screen is
+        built the first time and shown again for every later match """
+        if self.buttonList:
+            self.window.showTag("strategyScreen")
+            return
 
         # creates text to sit at the top and bottom of the screen and instruct
         # the player to choose a strategy 
@@ -99,91 +113,79 @@ class Game:
         self.texts[1].setFill("aquamarine4")
         self.texts[1].setSize(25)
 
-        # creates the six different buttons to represent the six different
-        # coded AI strategies the player can play against
-        self.buttonList.append(Rectangle(Point(100, 100), Point(300, 200)))
-        self.buttonList.append(Rectangle(Point(400, 100), Point(600, 200)))
-        self.buttonList.append(Rectangle(Point(100, 300), Point(300, 400)))
-        self.buttonList.append(Rectangle(Point(400, 300), Point(600, 400)))
-        self.buttonList.append(Rectangle(Point(100, 500), Point(300, 600)))
-        self.buttonList.append(Rectangle(Point(400, 500), Point(600, 600)))
+        # creates a button for every registered AI strategy the player can play
+        # against, laid out in two columns. The six built-in strategies fill three
+        # rows, and the rows get shorter to make room when more are registered
+        self.strategyNames = strategies.names()
+        rows = (len(self.strategyNames) + 1) // 2
+        height = min(100, 500 / (2 * rows - 1))
+        spacing = 0
+        if rows > 1:
+            spacing = (500 - height) / (rows - 1)
+        for n in range(len(self.strategyNames)):
+            left = 100 + 300 * (n % 2)
+            top = 100 + spacing * (n // 2)
+            self.buttonList.append(Rectangle(Point(left, top), Point(left + 200, top + height)))
+            self.window.addRegion(self.buttonList[n], self.strategyNames[n])
 
         # creates a list of colors and fills in each button with the corresponding
         # color to represent its specific AI strategy 
         colors = ["DarkOliveGreen4", "dark orange", "gold2", "brown4", "DarkSlateGray2", "RosyBrown2"]
         for b in range(len(self.buttonList)):
-            self.buttonList[b].setFill(colors[b])
+            self.buttonList[b].setFill(colors[b % len(colors)])
 
         # creates text to sit within each button and define to
-        # the user which strategy each button represents 
-        self.texts.append(Text(Point(200, 150), "Random Strategy"))
-        self.texts.append(Text(Point(500, 150), "Tit-for-Tat Strategy"))
-        self.texts.append(Text(Point(200, 350), "Random Tit-for-Tat Strategy"))
-        self.texts.append(Text(Point(500, 350), "Grudge Strategy"))
-        self.texts.append(Text(Point(200, 550), "PeaceMaker Strategy"))
-        self.texts.append(Text(Point(500, 550), "Adaptive Strategy"))
-
-        # changes the size of all the texts so they fit appropriately within the button 
-        for t in range(2, len(self.texts)):
-            self.texts[t].setSize(17)
-        self.texts[4].setSize(15)
+        # the user which strategy each button represents, shrinking
+        # the longer labels so they fit appropriately within the button
+        for n in range(len(self.strategyNames)):
+            label = Text(self.buttonList[n].getCenter(), strategies.label(self.strategyNames[n]))
+            if len(label.getText()) > 20:
+                label.setSize(15)
+            else:
+                label.setSize(17)
+            self.texts.append(label)
 
         # draws all of the previously created buttons and text to
-        # the window so that the user can interact with them
-        for b in self.buttonList:
-            b.draw(startWin)
-        
-        for t in self.texts:
-            t.draw(startWin)
+        # the window in a single frame so that the user can interact with them
+        self.window.drawGroup("strategyScreen", self.buttonList + self.texts)
 
     def playerChoice(self):
         """ allows the player to click on a specific button and play against
-        their chosen AI strategy """
-
-        # awaits a for a click from the user and initializes a boolean 
-        checkValid = False 
-        clickInitial = self.window.getMouse()
-
-        # loop ensures that the game does not crash if the player
-        # does not click on one of the six buttons and waits for
-        # another click if they do so
-        while checkValid == False:
-            if 100 <= clickInitial.x <= 300 and 100 <= clickInitial.y <= 200:
-                self.strategy = 1
-                return 1
-            elif 400 <= clickInitial.x <= 600 and 100 <= clickInitial.y <= 200:
-                self.strategy = 2
-                return 2
-            elif 100 <= clickInitial.x <= 300 and 300 <= clickInitial.y <= 400:
-                self.strategy = 3
-                return 3
-            elif 400 <= clickInitial.x <= 600 and 300 <= clickInitial.y <= 400:
-                self.strategy = 4
-                return 4
-            elif 100 <= clickInitial.x <= 300 and 500 <= clickInitial.y <= 600:
-                self.strategy = 5
-                return 5
-            elif 400 <= clickInitial.x <= 600 and 500 <= clickInitial.y <= 600:
-                self.strategy = 6
-                return 6
-            else:
-                clickInitial = self.window.getMouse()
+        their chosen AI strategy, returning the strategy's name """
+
+        # waits for a click from the user on one of the strategy buttons, which are
+        # registered as clickable regions named after their strategies, ignoring
+        # clicks elsewhere so that the game does not crash
+        name = self.window.getRegion()
+        self.strategy = self.strategyNames.index(name) + 1
+        return name
+
+    def chooseStrategy(self, name):
+        """ sets the bot to play the named AI strategy for the whole match. The
+        strategy is looked up once here rather than on every turn """
+        self.strat = name
+        self.match.bot.strategy = strategies.resolve(name)
 
     def buttonsErase(self):
-        """ erases all of the previously created buttons and text in the 
+        """ hides all of the previously created buttons and text in the 
         buttons() function so that the startScreen() function can run without
-        drawing over the previously created objects """
-        for b in self.buttonList:
-            b.undraw()
-        for t in self.texts:
-            t.undraw()
+        drawing over the previously created objects. They all carry the same tag,
+        so they are hidden with a single change and kept for the next match """
+        self.window.hideTag("strategyScreen")
 
     def startScreen(self):
         """ creates the screen for the actual game itself, including the gameboard, 
-        score boxes, and actual buttons for the player to interact with """
-
-        # sets the background of the gameboard to an appropriate color
-        self.window.setBackground("bisque2")
+        score boxes, and actual buttons for the player to interact with. The
+        screen is built the first time and shown again with cleared score boxes
+        for every later match """
+        if self.objectList:
+            with self.window.frame():
+                self.window.setBackground("bisque2")
+                for t in self.scoreWidgets:
+                    t.setText("")
+                self.showPayoffs()
+                self.window.showTag("gameScreen")
+            return
 
         # creates two buttons at the bottom of the screen that the player uses to
         # select their move and text to go inside the buttons to describe them
@@ -195,6 +197,8 @@ class Game:
         self.startText[1].setSize(20)
         self.objectList[0].setFill("LightBlue2")
         self.objectList[1].setFill("red4")
+        self.window.addRegion(self.objectList[0], self.playerCoop)
+        self.window.addRegion(self.objectList[1], self.playerDefect)
 
         # creates the actual gameboard to the screen by drawings lots of lines
         # to represent the different scoring and payoff options to the player 
@@ -224,15 +228,16 @@ class Game:
             self.startText[t].setSize(13)
 
         # creates the payoff text to sit within the gameboard triangles at
-        # various colors to represent the worth of each choice the player makes
-        self.startText.append(Text(Point(218,138),"2"))
-        self.startText.append(Text(Point(218,313),"3"))
-        self.startText.append(Text(Point(306,138),"2"))
-        self.startText.append(Text(Point(394,138),"0"))
-        self.startText.append(Text(Point(481,138),"3"))
-        self.startText.append(Text(Point(306,313),"0"))
-        self.startText.append(Text(Point(394,313),"1"))
-        self.startText.append(Text(Point(481,313),"1"))
+        # various colors to represent the worth of each choice the player makes. The
+        # player's points sit in the left triangle of each square and the bot's in the
+        # right, and the numbers come from the match's payoff matrix
+        self.payoffLabels = [((218,138), ('C','C'), 0), ((218,313), ('D','C'), 0),
+                             ((306,138), ('C','C'), 1), ((394,138), ('C','D'), 0),
+                             ((481,138), ('C','D'), 1), ((306,313), ('D','C'), 1),
+                             ((394,313), ('D','D'), 0), ((481,313), ('D','D'), 1)]
+        for (x, y), moves, side in self.payoffLabels:
+            self.startText.append(Text(Point(x,y), ""))
+        self.showPayoffs()
 
         # creates a list of colors and fills in the appropriate
         # payoff text with the correct color 
@@ -250,443 +255,313 @@ class Game:
         self.startText.append(Text(Point(625,38),"Bot Score"))
         self.startText[17].setSize(15)
 
-        # draws the previously created shapes and text objects to the
-        # window to create the start screen 
-        for o in self.objectList:
-            o.draw(self.window)
-
-        for t in self.startText:
-            t.draw(self.window)
+        # creates the texts that change as the game goes on: both scores, the bot's last
+        # move and a strip of the most recent moves. Each keeps the same canvas item for
+        # the whole game and only has its text changed after every turn
+        self.playerScoreText = Text(Point(69,90), "")
+        self.botScoreText = Text(Point(625,90), "")
+        self.moveText = Text(Point(350,475), "")
+        self.moveText.setSize(15)
+        self.historyStrip = Text(Point(350,430), "")
+        self.historyStrip.setSize(11)
+        self.scoreWidgets = [self.playerScoreText, self.botScoreText, self.moveText, self.historyStrip]
+
+        # sets the background of the gameboard to an appropriate color and draws the
+        # previously created shapes and text objects to the window to create the start
+        # screen, showing them all in a single frame
+        with self.window.frame():
+            self.window.setBackground("bisque2")
+            self.window.drawGroup("gameScreen", self.objectList + self.startText + self.scoreWidgets)
+
+    def showPayoffs(self):
+        """ writes the points from the match's payoff matrix into the gameboard triangles """
+        for t in range(len(self.payoffLabels)):
+            position, moves, side = self.payoffLabels[t]
+            self.startText[8 + t].setText("%g" % self.match.payoffs[moves][side])
 
     def playerCoop(self):
-        """ activates if the player selects the cooperate button, updating
-        their move for the program and storing it in a list of player move history """
-        self.playerMove = 'C'
-        self.playerHistory.append(self.playerMove)
-        return self.playerMove, self.playerHistory
+        """ activates if the player selects the cooperate button, recording
+        their move in the match """
+        return self.match.playerTurn('C')
 
     def playerDefect(self):
-        """ activates if the player selects the defect button, updating their 
-        their move for the program and storing it in a list of player move history """
-        self.playerMove = 'D'
-        self.playerHistory.append(self.playerMove)
-        return self.playerMove, self.playerHistory
-
-    def botCoop(self):
-        """ activiates if the bot chooses to cooperate, updating its move for
-        the program and storing the move in a list of bot move history """
-        self.botMove = 'C'
-        self.botHistory.append(self.botMove)
-        return self.botMove, self.botHistory
-
-    def botDefect(self):
-        """ activates if the bot chooses to defect, updating its move for the 
-        program and storing it in a list of bot move history """
-        self.botMove = 'D'
-        self.botHistory.append(self.botMove)
-        return self.botMove, self.botHistory
-
-    def randMove(self):
-        """ represents the random AI strategy, using the random module to randomly 
-        choose between cooperating or defecting """
-        move = choice([1,2])
-        if move == 1:
-            self.botDefect()
-        else:
-            self.botCoop()
-
-    def titForTat(self):
-        """ represents an AI strategy that simply mimics the last move of the player 
-        by indexing through a list of their past moves and choosing the 2nd to last 
-        index as the AI's move """
-
-        # this handles the edge case at the start of the game where the player has not
-        # chosen enough moves for indexing by -2 to work
-        if len(self.playerHistory) < 2:
-            self.botMove = self.playerHistory[-1]
-            self.botHistory.append(self.botMove)
-        else:
-            self.botMove = self.playerHistory[-2]
-            self.botHistory.append(self.botMove)
-        return self.botMove, self.botHistory
-
-    def randomTitForTat(self):
-        """ creates another AI strategy that, depending on a randomly determined 
-        intervalat the start of the game, either mimics the player's last move or 
-        chooses a random move """
-        if self.randCount % self.randMoves == 0:
-            self.randMove()
-        else:
-            self.titForTat()
-
-        # updates the interval after each turn so that the AI will switch
-        # between a random or mimicked move
-        self.randCount += 1
-
-    def implementAdaptive(self, avg):
-        """ implements specific scoring functions for the adaptive
-        AI function that are used in updateScore() """
-        if len(avg) < 6:
-            avg.append(self.botScore)
-        else:
-            avg.remove(avg[0])
-            avg.append(self.botScore)
-                
-    def updateScore(self, lastPlayerScore, lastBotScore, lastMove):
+        """ activates if the player selects the defect button, recording
+        their move in the match """
+        return self.match.playerTurn('D')
+
+    def phase(self, name):
+        """ returns a context that times its with block as the named phase of a
+        turn when the game has a profiler, and does nothing otherwise """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(name)
+
+    def updateScore(self):
         """ updates each player's score based on the last moves made by both the bot and
         the player and displays these updated scores to the main game screen """
 
-        # when both the player and AI choose to cooperate, their score increases
-        # by 2 points each
-        if self.playerMove == 'C' and self.botMove == 'C':
-            self.playerScore += 2
-            self.botScore += 2
-            self.implementAdaptive(self.cAvg)
-                    
-        # when the player chooses to defect and the AI chooses to cooperate, 3 points
-        # are added to the player's score, but the AI receives 0 points. 
-        elif self.playerMove == 'D' and self.botMove == 'C':
-            self.playerScore += 3
-            self.botScore += 0
-            self.implementAdaptive(self.dAvg)
-            
-        # if the player chooses to cooperate but the AI chooses to defect, the player
-        # then receives 0 points while the AI receives 3 points 
-        elif self.playerMove == "C" and self.botMove == "D":
-            self.playerScore += 0
-            self.botScore += 3
-            self.implementAdaptive(self.cAvg)
-
-        # if both the player and the bot choose to defect, the player and the bot will each
-        # receive 1 points added to their score 
-        elif self.playerMove == 'D' and self.botMove == 'D':
-            self.playerScore += 1
-            self.botScore += 1
-            self.implementAdaptive(self.dAvg)
-
-        # undraws all of the previously displayed player and bot scores, as well as the
-        # bot's last move so that the new scores and move can be displayed 
-        lastPlayerScore.undraw()
-        lastBotScore.undraw()
-        lastMove.undraw()
-
-        # updates the display with the new player score, bot score, and bot move and assigns
-        # them to new variables so they are not immediatley overwritten 
-        playerScoreDisp = Text(Point(69,90), str(self.playerScore))
-        botScoreDisp = Text(Point(625,90), str(self.botScore))
-        display = "Bot's Move: " + str(self.botMove)
-        displayText = Text(Point(350,475), display)
-        displayText.setSize(15)
-        lastPlayerScore = playerScoreDisp
-        lastBotScore = botScoreDisp
-        lastMove = displayText
-
-        # draws the updated player score, bot score, as well as the bot's last move to
-        # the main game screen 
-        playerScoreDisp.draw(self.window)
-        botScoreDisp.draw(self.window)
-        displayText.draw(self.window)
-
-        # adds 1 so that the number of turns that have occured can be counted
-        self.round += 1
-
-        return lastPlayerScore, lastBotScore, lastMove
+        # lets the match engine add the points for this round's moves, as shown on the
+        # gameboard, and move on to the next round
+        with self.phase("scoring"):
+            self.match.scoreRound()
+
+        # changes the text of the score boxes, the bot's move and the strip of the last
+        # few moves in place, all in a single frame, rather than drawing new text
+        with self.phase("render"), self.window.frame():
+            self.playerScoreText.setText(str(self.match.player.score))
+            self.botScoreText.setText(str(self.match.bot.score))
+            self.moveText.setText("Bot's Move: " + str(self.match.bot.move))
+            self.historyStrip.setText("You: " + " ".join(self.match.player.history.last(15)) +
+                                      "     Bot: " + " ".join(self.match.bot.history.last(15)))
 
     def playerTurn(self):
         """ registers the player's mouse click, ensuring it is in the right range, and 
         returns which button they have selected as their move choice """
-        click1 = self.window.getMouse()
+        # the cooperate and defect buttons are clickable regions whose handlers
+        # register the player's move
+        move = self.window.hitTest(self.window.getMouse())
 
         # initializes error text to display if the player makes an invalid click 
         errorText = Text(Point(350, 500),"Error: Please Click on a Button")
         errorText.setFill("red")
         errorText.setSize(15)
 
-        # checks to make sure the player's click is valid, and if it is not, displays
-        # error text and awaits another mouse click from the user 
-        while not 100 <= click1.x <= 300 and not 550 <= click1.y <= 650 or not 400 <= click1.x <= 600 and not 550 <= click1.y <= 650:
-            errorText.undraw()
-            errorText.draw(self.window)
-            click1 = self.window.getMouse()
+        # checks to make sure the player's click is on one of the buttons, and if it
+        # is not, displays error text and awaits another mouse click from the user 
+        while move is None:
+            with self.window.frame():
+                errorText.undraw()
+                errorText.draw(self.window)
+            move = self.window.hitTest(self.window.getMouse())
 
         errorText.undraw()
 
-        # if the player chooses the first, leftmost button, registers the player's move
-        # as a cooperation 
-        if 100 <= click1.x <= 300 and 550 <= click1.y <= 650:
-            self.playerCoop()
-
-        # otherwise, if the player chooses the rightmost button, registers the player's
-        # move as a defection 
-        elif 400 <= click1.x <= 600 and 550 <= click1.y <= 650:
-            self.playerDefect()
-            
+        # registers the player's move as a cooperation or a defection, depending
+        # on the button they chose
+        move()
         self.turn += 1
 
-    def grudges(self):
-        """ represents the AI strategy of a grudge, where the AI cooperates until defected on, 
-        and then precedes to defect """
-        if self.playerHistory[-1] == 'D':
-            self.grudge = True
-        if self.grudge:
-            self.botDefect()
-        else:
-            self.botCoop()
-
-    def peaceMaker(self):
-        """ represents the peacemaker AI strategy that mimics the plays randomly until defected 
-        on twice, then defects, and then mimics the player's moves, but will occasionally 
-        cooperate instead of defecting """
-        defectCount = 0
-
-        # loops through and counts the number of defections made by the player
-        for item in self.playerHistory:
-            if item == 'D':
-                defectCount += 1
-
-        # defects if the player has defected twice 
-        if defectCount == 2:
-            self.botDefect()
-
-        # if the player has defected twice, the AI either cooperates or mimics the player's
-        # last move 
-        elif defectCount > 2:
-            stratMove = choice([1,2])
-            if stratMove == 1:
-                self.botCoop()
-            else:
-                self.titForTat()
-
-        # the AI plays randomly until the player has defected twice 
-        else:
-            self.randMove()
-
-    def adaptive(self):
-        """ functions as an adaptive AI strategy that uses the average score
-        from the past six moves, and after registering which one is higher, uses
-        that as their move to have the best shot at winning """
-
-        # calculates the averages of both cooperations and defections over the last 6 rounds
-        cAvg = sum(self.cAvg)/6
-        dAvg = sum(self.dAvg)/6
-
-        # defects for the first three rounds of the game, cooperating the next 3
-        if 1 <= self.round <= 3:
-            self.botDefect()
-        elif 4 <= self.round <= 6:
-            self.botCoop()
-
-        # then precedes to calculate the average score benefits of both cooperating and
-        # defecting over the last 6 rounds, using that to play the better move 
-        elif cAvg > dAvg:
-            self.botCoop()
-        else:
-            self.botDefect()
-
-    def eraseStartScreen(self, a, b, c):
-        """ erases the gameboard, scoreboard, and buttons so that the endscreen game
-        data can be displayed """
-        for o in self.objectList:
-            o.undraw()
-
-        for t in self.startText:
-            t.undraw()
-        
-        a.undraw()
-        b.undraw()
-        c.undraw()
-
-    def keepScore(self, curGame):
-        """ registers the players current wins against all the different AI 
-        strategies throughout all of their runs in the game """
-
-        # runs if this is after the player's first game, opening the score.txt file
-        # and splitting into a list to prepare it to be overwritten
-        if curGame >= 1:
-            scoreHistory = open("scores.txt")
-            scoreHistoryStr = scoreHistory.read()
-            scoreHistoryList = scoreHistoryStr.split()
-
-        # if this is the player's first game, then it creates the scoreHistoryList to be
-        # written into a new file 
-        else: 
-            scoreHistoryList= ["Random: ", 0, "Tit-for-Tat: ", 0, "Random-Tit-for-Tat: ", 0, "Grudge: ", 0, "PeaceMaker: ", 0, "Adaptive: ", 0]
-            
-        # if the player won, adds a point to their wins under the strategy they played against
-        if self.playerScore > self.botScore:         
-            scoreHistoryList[(self.strategy*2) - 1] = int(scoreHistoryList[(self.strategy*2) - 1]) + 1
-
-        # opens the file and writes the newly updated data of scoreHistoryList to the file
-        scoreFile = open("scores.txt", "w")
-        for item in scoreHistoryList:
-            scoreFile.write(str(item) + " ")
-            
-        scoreFile.close()
-        curGame += 1
-        return curGame
+    def eraseStartScreen(self):
+        """ hides the gameboard, scoreboard, and buttons so that the endscreen game
+        data can be displayed. They all carry the same tag, so they are hidden with
+        a single change and kept for the next match """
+        self.window.hideTag("gameScreen")
+
+    def keepScore(self):
+        """ records the result of this game in the score store, which keeps the
+        player's career against all the different AI strategies """
+        self.store.recordMatch(self.match, HUMAN, self.strat, self.seed)
+        self.store.flush()
+        if self.log is not None:
+            self.log.writeMatch(self.match, HUMAN, self.strat, self.seed)
+            self.log.flush()
+
+    def careerText(self):
+        """ returns the player's wins against each AI strategy as a line of text
+        for the endscreen, or nothing when the game keeps no score store """
+        if self.store is None:
+            return ""
+        stats = self.store.careerStats()
+        career = []
+        for name in strategies.names():
+            wins = stats.get(name, (0, 0, 0))[0]
+            career.append(strategies.label(name).replace(" Strategy", "") + ": " + str(wins))
+        return "   ".join(career)
+
+    def replay(self, logged, delay=0.5):
+        """ plays back a match read from the match log on the game screens, showing
+        a round every delay seconds, and then shows the endscreen. Returns whether
+        the player clicked to play again """
+        self.runs = logged.rounds
+        self.match = Match(None, None, logged.rounds, logged.payoffs)
+        self.strat = logged.botStrategy
+        self.seed = logged.seed
+        playerHistory, botHistory = logged.histories()
+
+        # feeds the logged moves to the match engine in place of the player's clicks
+        # and the bot's strategy, updating the screen after every round
+        self.startScreen()
+        for round in range(logged.rounds):
+            self.match.playerTurn(playerHistory[round])
+            self.match.botTurn(botHistory[round])
+            self.updateScore()
+            time.sleep(delay)
+
+        self.eraseStartScreen()
+        return self.endScreen()
 
     def endScreen(self):
         """ creates and endscreen to play once the randomly determined number of 
         rounds has been reached, displaying both the bot and player history, their
-        respective scores, and if the player has either won, tied, or lost """
+        respective scores, and if the player has either won, tied, or lost. The
+        screen is built the first time, and later matches only change its text """
 
-        # resets the background back to white to display data effectively
-        self.window.setBackground("white")
-        
         # creates the window for the endgame score screen and converts the lists of
         # move history and respective scores for both the bot and player to strings 
-        playerHistoryStr = " ".join(self.playerHistory)
-        botHistoryStr = " ".join(self.botHistory)
-        playerScoreStr = str(self.playerScore)
-        botScoreStr = str(self.botScore)
-
-        # creates text to display at te top of screen and inform the user
-        # of the window's purpose 
-        self.endingText.append(Text(Point(350, 50), "Endgame Statistics: "))
-        self.endingText[0].setFill("aquamarine4")
-        self.endingText[0].setSize(25)
-
-        # creates displayable text for the both the player score and move history
-        # and the bot score and move history 
-        self.endingText.append(Text(Point(350, 100), "Player History:\n\n" + playerHistoryStr))
-        self.endingText.append(Text(Point(350, 200), "Bot History:\n\n" + botHistoryStr))
-        self.endingText.append(Text(Point(350, 300), "Player Score:\n\n" + playerScoreStr))
-        self.endingText.append(Text(Point(350, 400), "Bot Score:\n\n" + botScoreStr))
-
-        # checks if the player either won, tied, or lost by comparing the scores of the bot
-        # and player, displaying different text at the bottom of the screen depending on each case
-        if self.playerScore > self.botScore:
-            self.endingText.append(Text(Point(350, 625), "Congragulations! You Won!\n\nNow Try Against Another Strategy"))
-            self.endingText[5].setFill("forest green")
+        playerHistoryStr = str(self.match.player.history)
+        botHistoryStr = str(self.match.bot.history)
+        playerScoreStr = str(self.match.player.score)
+        botScoreStr = str(self.match.bot.score)
+
+        if not self.endingText:
+            # creates text to display at te top of screen and inform the user
+            # of the window's purpose 
+            self.endingText.append(Text(Point(350, 50), "Endgame Statistics: "))
+            self.endingText[0].setFill("aquamarine4")
+            self.endingText[0].setSize(25)
+
+            # creates the text for the both the player score and move history and the
+            # bot score and move history, along with the result at the bottom of the
+            # screen, which are all filled in below for each match
+            self.endingText.append(Text(Point(350, 100), ""))
+            self.endingText.append(Text(Point(350, 200), ""))
+            self.endingText.append(Text(Point(350, 300), ""))
+            self.endingText.append(Text(Point(350, 400), ""))
+            self.endingText.append(Text(Point(350, 625), ""))
             self.endingText[5].setSize(25)
-        elif self.playerScore < self.botScore:
-            self.endingText.append(Text(Point(350, 625), "You Lost...\nRematch Against the Same Strategy!"))
+
+            # creates a play again or quit button so that the user can either try again against
+            # the same or different strategy or quit the game 
+            self.endingText.append(Rectangle(Point(75, 375), Point(225, 475)))
+            self.endingText[6].setFill("gold2")
+            self.endingText.append(Text(Point(150, 425), "Play Again?"))
+            self.endingText[7].setSize(25)
+            self.endingText.append(Rectangle(Point(475, 375), Point(625, 475)))
+            self.endingText[8].setFill("firebrick4")
+            self.endingText.append(Text(Point(550, 425), "Quit"))
+            self.endingText[9].setSize(25) 
+            self.window.addRegion(self.endingText[6], True)
+            self.window.addRegion(self.endingText[8], False)
+
+            # creates the text for the player's career, showing their number of wins
+            # against various strategies
+            self.endingText.append(Text(Point(350, 520), ""))
+            self.endingText[10].setFill("aquamarine4")
+            self.endingText[10].setSize(15)
+
+            # draws the screen hidden so that it appears with its text already filled in
+            self.window.hideTag("endScreen")
+            self.window.drawGroup("endScreen", self.endingText)
+
+        # fills in both histories and scores, and checks if the player either won, tied,
+        # or lost by comparing the scores of the bot and player, displaying different text
+        # at the bottom of the screen depending on each case
+        self.endingText[1].setText("Player History:\n\n" + playerHistoryStr)
+        self.endingText[2].setText("Bot History:\n\n" + botHistoryStr)
+        self.endingText[3].setText("Player Score:\n\n" + playerScoreStr)
+        self.endingText[4].setText("Bot Score:\n\n" + botScoreStr)
+        if self.match.player.score > self.match.bot.score:
+            self.endingText[5].setText("Congragulations! You Won!\n\nNow Try Against Another Strategy")
+            self.endingText[5].setFill("forest green")
+        elif self.match.player.score < self.match.bot.score:
+            self.endingText[5].setText("You Lost...\nRematch Against the Same Strategy!")
             self.endingText[5].setFill("firebrick4")
-            self.endingText[5].setSize(25)
         else:
-            self.endingText.append(Text(Point(350, 625), "You Tied.\nTry Again to Prove Your Mastery!"))
+            self.endingText[5].setText("You Tied.\nTry Again to Prove Your Mastery!")
             self.endingText[5].setFill("cadet blue")
-            self.endingText[5].setSize(25)
 
-        # creates a play again or quit button so that the user can either try again against
-        # the same or different strategy or quit the game 
-        self.endingText.append(Rectangle(Point(75, 375), Point(225, 475)))
-        self.endingText[6].setFill("gold2")
-        self.endingText.append(Text(Point(150, 425), "Play Again?"))
-        self.endingText[7].setSize(25)
-        self.endingText.append(Rectangle(Point(475, 375), Point(625, 475)))
-        self.endingText[8].setFill("firebrick4")
-        self.endingText.append(Text(Point(550, 425), "Quit"))
-        self.endingText[9].setSize(25) 
-
-        # opens the scores file and adds it the endgame screen to display their number of wins
-        # against various strategies
-        scoreFile = open("scores.txt", "r")
-        scoreFileStr = scoreFile.read()
-        self.endingText.append(Text(Point(350, 520), "Career Average (in wins):\n\n" + scoreFileStr))
-        self.endingText[10].setFill("aquamarine4")
-        self.endingText[10].setSize(15)
-        scoreFile.close()
+        # reads the player's career from the score store and adds it to the endgame screen
+        self.endingText[10].setText("Career Average (in wins):\n\n" + self.careerText())
         
-        # draws all the the previously created text and buttons to the endscreen window
-        for t in self.endingText:
-            t.draw(self.window)
-
-        # waits for a mouse click by the user
-        clickFinal = self.window.getMouse()
-
-        # checks if the mouse click is in the range of either button, either playing again
-        # or closing the window, or waits until a mouse click is within one of the valid ranges
-        again = False
-        while again == False: 
-            if 75 <= clickFinal.x <= 225 and 375 <= clickFinal.y <= 475:
-                again = True
-                break
-            elif 475 <= clickFinal.x <= 625 and 375 <= clickFinal.y <= 475:
-                break
-            else: 
-                clickFinal = self.window.getMouse() 
-
+        # resets the background back to white to display data effectively and shows
+        # the endscreen in a single frame
+        with self.window.frame():
+            self.window.setBackground("white")
+            self.window.showTag("endScreen")
+
+        # waits until the user clicks either button, either playing again or closing
+        # the window. The buttons are clickable regions that answer whether to play again
+        again = self.window.getRegion()
+
+        # hides the endscreen so that the next match can show its own screens
+        self.window.hideTag("endScreen")
         return again
                 
+def replayMatch(path, n=-1):
+    """ shows the nth match of a match log, the last one by default, on the
+    game screens, one round at a time """
+    with MatchLog(path) as log:
+        prisGame = Game()
+        prisGame.replay(log[n])
+        prisGame.window.close()
+
 def main():
-    # runs the class to start the game, printing the instructions to
-    # the start screen 
-    prisGame = Game()
+    # "--replay log [n]" plays back a match from a match log instead of a new game
+    if sys.argv[1:2] == ["--replay"]:
+        n = -1
+        if len(sys.argv) > 3:
+            n = int(sys.argv[3])
+        replayMatch(sys.argv[2], n)
+        return
+
+    # "--profile trace.json" times the phases of every turn and counts the window's
+    # updates and canvas items, writing them out as a Chrome trace at the end
+    arguments = sys.argv[1:]
+    profiler = None
+    tracePath = None
+    if arguments[:1] == ["--profile"]:
+        tracePath = arguments[1]
+        arguments = arguments[2:]
+        profiler = Profiler()
+        setProfiler(profiler)
+
+    # loads any extra AI strategies that are installed as entry points or named
+    # as modules on the command line, so they appear on the selection screen
+    strategies.loadEntryPoints()
+    for moduleName in arguments:
+        strategies.loadModule(moduleName)
+
+    # opens the score store that keeps the player's career and the log of every
+    # match, then runs the class to start the game, printing the instructions
+    # to the start screen 
+    store = ScoreStore()
+    log = MatchLogWriter("matches.pdl")
+    prisGame = Game(store=store, log=log, profiler=profiler)
     prisGame.instructions()
     again = True
-    curGame = 0 
 
     # allows the game to be played until the user decides to stop by clicking
     # a button in the endscreen 
     while again == True:
         
-        # allows the user to choose their specific AI strategy to play against
+        # allows the user to choose their specific AI strategy to play against,
+        # which the bot then plays for the whole match
         prisGame.buttons()
-        x = prisGame.playerChoice()
+        prisGame.chooseStrategy(prisGame.playerChoice())
 
         # erases the objects created for the selection screen and creates the main
-        # game screen with the gameboard, buttons, and player and bot scores 
-        prisGame.buttonsErase()
-        prisGame.startScreen()
+        # game screen with the gameboard, buttons, and player and bot scores, repainting
+        # the window once for the whole change of screen
+        with prisGame.window.frame():
+            prisGame.buttonsErase()
+            prisGame.startScreen()
 
-        # intializes variables for the while loop that run for the entirety of the game
+        # intializes the turn count for the while loop that runs for the entirety of the game
         curTurn = 0
-        a = Text(Point(69,75), "")
-        b = Text(Point(594,75), "")
-        c = Text(Point(350,475), "")
 
         # loop that runs turns of the game until the randomly determined number of
-        # runs has been reached 
+        # runs has been reached, with the bot answering each of the player's moves.
+        # Waiting for the player's click and the bot's strategy are timed apart
         while curTurn <= prisGame.runs:
-            prisGame.playerTurn()
-
-            # operates if the player chose the random AI strategy
-            if x == 1:
-                prisGame.randMove()
-                prisGame.strat = "rand"
-
-            # operates if the player chose the Tit-for-Tat AI strategy
-            elif x == 2:
-                prisGame.titForTat()
-                prisGame.strat = "titForTat"
-
-            # operates if the player chose the random Tit-for-Tat AI strategy
-            elif x == 3:
-                prisGame.randomTitForTat()
-                prisGame.strat = "randomTitForTat"
-
-            # operates if the player chose the Grudge AI strategy
-            elif x == 4:
-                prisGame.grudges()
-                prisGame.start = "grudges"
-
-            # operates if the player chose the PeaceMaker AI strategy 
-            elif x == 5:
-                prisGame.peaceMaker()
-                prisGame.strat = "peaceMaker"
-
-            # operates if the player chose the Adaptive AI Strategy
-            elif x == 6:
-                prisGame.adaptive()
-                prisGame.strat = "adaptive"
-
-            # passes the player's score, bot's score, and bot's move as parameters
-            # in main so that they can be overwritten in the updateScore() function
-            a, b, c = prisGame.updateScore(a, b, c)
+            with prisGame.phase("input"):
+                prisGame.playerTurn()
+            with prisGame.phase("strategy"):
+                prisGame.match.botTurn()
+
+            # scores the turn and updates the score boxes and bot's move on the screen
+            prisGame.updateScore()
             curTurn += 1
 
         # runs keepScore() to track the player's wins against various AI strategies
         # while also erasing the startScreen and running the endscreen data
-        curGame = prisGame.keepScore(curGame)
-        prisGame.eraseStartScreen(a, b, c)
+        prisGame.keepScore()
+        prisGame.eraseStartScreen()
         y = prisGame.endScreen()
 
-        # if they clicked the continue button, closes this window of the game and runs
-        # a new instance of the class so they can play another game
+        # if they clicked the continue button, sets up a new match in the same window,
+        # whose screens are shown again rather than rebuilt, so they can play another game
         if y:
-             prisGame.window.close()
-             prisGame = Game()
+             prisGame.newMatch()
              again = True
 
         # otherwise, if they chose to quit, the game simply closes the window and ceases action
@@ -694,6 +569,12 @@ def main():
             break
         
     prisGame.window.close()
+    store.close()
+    log.close()
+    if profiler is not None:
+        setProfiler(None)
+        profiler.writeTrace(tracePath)
+        print(profiler.report())
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,215 @@
+# Benchmarks
+# Timing checks for the match engine, the tournaments and the game's
+# screens. Running this file measures how long each round of a match
+# takes as the matches get longer. Every strategy keeps the state it
+# needs as moves are recorded, so the cost of a round should stay flat
+# however many rounds have already been played; the script exits with an
+# error if it grows.
+#
+# It also measures how many rounds a second each strategy plays, from 10
+# to 10^6 rounds a match, how many matches a second the vectorized round
+# robin and the scheduler play, and how much canvas work the start, score
+# and end screens do, drawn into a graphics.HeadlessWin so no display is
+# needed. The results can be written out as JSON and compared with the
+# results of an earlier commit, failing when any of them got worse by
+# more than a tolerance.
+
+import argparse
+import json
+import sys
+import time
+from random import Random
+
+from engine import playMatch
+import graphics
+import scheduler
+import strategies
+import tournament
+
+# the round counts to time, and how much slower per round the longest match
+# may be than the shortest before the benchmark fails
+ROUND_COUNTS = [100, 1000, 10000, 100000]
+MAX_GROWTH = 2.0
+
+# the match lengths each strategy's rounds per second are measured at, and how
+# many rounds are played at each, over as many matches as it takes
+RATE_ROUND_COUNTS = [10, 100, 1000, 10000, 100000, 1000000]
+RATE_MIN_ROUNDS = 100000
+
+# how much worse than the baseline a rate or time may be before it counts as a
+# regression. Counts of canvas calls do not vary between runs, so any growth does
+TOLERANCE = 0.25
+
+def timePerRound(strategy, runs, opponent=strategies.randMove, repeats=3):
+    """ returns the fastest time per round, in seconds, of a match of the given
+    length between the strategy and its opponent """
+    best = None
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        playMatch(opponent, strategy, runs, rng=Random(repeat))
+        elapsed = (time.perf_counter() - start) / runs
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def checkFlat(strategy, roundCounts=ROUND_COUNTS, maxGrowth=MAX_GROWTH):
+    """ times the strategy at each round count, printing the cost per round, and
+    returns whether the cost per round stayed within maxGrowth of the shortest match """
+    costs = []
+    for runs in roundCounts:
+        cost = timePerRound(strategy, runs)
+        costs.append(cost)
+        print("%-16s %8d rounds %8.2f us/round" % (strategy.__name__, runs, cost * 1e6))
+    return costs[-1] <= costs[0] * maxGrowth
+
+def metric(value, unit, better):
+    """ returns one result, with better saying whether a "higher" or "lower"
+    value is an improvement """
+    return {"value": value, "unit": unit, "better": better}
+
+def roundsPerSecond(strategy, runs, opponent=strategies.randMove, minRounds=RATE_MIN_ROUNDS):
+    """ returns how many rounds a second the strategy plays against its opponent
+    in matches of the given length, playing matches until at least minRounds
+    rounds have been played so that short matches are timed over many """
+    matches = max(1, -(-minRounds // runs))
+    start = time.perf_counter()
+    for repeat in range(matches):
+        playMatch(opponent, strategy, runs, rng=Random(repeat))
+    return matches * runs / (time.perf_counter() - start)
+
+def strategyRates(roundCounts=RATE_ROUND_COUNTS):
+    """ measures the rounds per second of every strategy at each match length """
+    results = {}
+    for strategy in strategies.STRATEGIES:
+        for runs in roundCounts:
+            rate = roundsPerSecond(strategy, runs)
+            results["strategy.%s.%d" % (strategy.__name__, runs)] = metric(rate, "rounds/s", "higher")
+            print("%-16s %8d rounds %12.0f rounds/s" % (strategy.__name__, runs, rate))
+    return results
+
+def tournamentRates(runs=10, repetitions=10000, shardRepetitions=200):
+    """ measures the matches per second of a whole round robin, both vectorized
+    with tournament.roundRobin and match by match with the scheduler in this process """
+    pairings = len(tournament.STRATEGIES) * (len(tournament.STRATEGIES) + 1) // 2
+    start = time.perf_counter()
+    tournament.roundRobin(runs, repetitions, seed=0)
+    vectorized = pairings * repetitions / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    played = 0
+    for shard in scheduler.runTournament(shardRepetitions, runs=runs, workers=1):
+        played += len(shard)
+    scheduled = played / (time.perf_counter() - start)
+
+    print("%-16s %12.0f matches/s" % ("roundRobin", vectorized))
+    print("%-16s %12.0f matches/s" % ("runTournament", scheduled))
+    return {"tournament.roundRobin": metric(vectorized, "matches/s", "higher"),
+            "tournament.runTournament": metric(scheduled, "matches/s", "higher")}
+
+def canvasCost(window, draw, repeats=1):
+    """ calls draw the given number of times, returning the canvas calls each call
+    made on the headless window and the mean time it took """
+    calls = len(window.calls)
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        draw()
+    elapsed = (time.perf_counter() - start) / repeats
+    return (len(window.calls) - calls) // repeats, elapsed
+
+def screenCosts(updates=1000):
+    """ measures the canvas calls and time of building the start screen, showing it
+    again for a second match, updating the score and showing the end screen, with
+    the game drawn into a HeadlessWin """
+    # the game module is imported here, as it swaps its window for a headless one
+    import PrisonersDilemma
+
+    PrisonersDilemma.GraphWin = graphics.HeadlessWin
+    game = PrisonersDilemma.Game(seed=0)
+    window = game.window
+    game.chooseStrategy("titForTat")
+
+    def turn():
+        game.match.playerTurn("C")
+        game.match.botTurn()
+        game.updateScore()
+
+    def end():
+        # clicks Play Again so the end screen returns
+        window.click(550, 425)
+        game.endScreen()
+
+    costs = {}
+    costs["startScreen"] = canvasCost(window, game.startScreen)
+    costs["updateScore"] = canvasCost(window, turn, updates)
+    costs["endScreen"] = canvasCost(window, end)
+    game.eraseStartScreen()
+    game.newMatch(1)
+    costs["startScreen.again"] = canvasCost(window, game.startScreen)
+    costs["endScreen.again"] = canvasCost(window, end)
+
+    results = {}
+    for name, (calls, elapsed) in costs.items():
+        results["canvas.%s.calls" % name] = metric(calls, "calls", "lower")
+        results["canvas.%s.time" % name] = metric(elapsed, "s", "lower")
+        print("%-18s %6d canvas calls %10.1f us" % (name, calls, elapsed * 1e6))
+    return results
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """ returns a line for every result that is worse than the same result in the
+    baseline, allowing rates and times to be worse by the tolerance """
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        value = results[name]["value"]
+        old = baseline[name]["value"]
+        allowed = 0.0 if results[name]["unit"] == "calls" else tolerance
+        if results[name]["better"] == "higher":
+            worse = value < old * (1 - allowed)
+        else:
+            worse = value > old * (1 + allowed)
+        if worse:
+            regressions.append("%s: %.6g %s, was %.6g" % (name, value, results[name]["unit"], old))
+    return regressions
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Times the engine, tournaments and screens.")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="fail if any result is worse than in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="how much worse a rate or time may be than the baseline")
+    parser.add_argument("--quick", action="store_true",
+                        help="stop the strategy rates at 10^4 rounds a match")
+    options = parser.parse_args(arguments)
+
+    flat = True
+    for strategy in strategies.STRATEGIES:
+        if not checkFlat(strategy):
+            print("%s: cost per round grows with the number of rounds" % strategy.__name__)
+            flat = False
+
+    roundCounts = RATE_ROUND_COUNTS
+    if options.quick:
+        roundCounts = [runs for runs in roundCounts if runs <= 10000]
+    results = {}
+    results.update(strategyRates(roundCounts))
+    results.update(tournamentRates())
+    results.update(screenCosts())
+
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, options.tolerance)
+        for line in regressions:
+            print("regression: " + line)
+        if regressions:
+            return False
+    return flat
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,154 @@
+# Match Engine
+# Plays a Prisoner's Dilemma match between two strategies without any
+# graphics, so that matches can be simulated on machines that have no
+# display. The Game class in PrisonersDilemma.py drives the same engine
+# with the human player's clicks on one side.
+
+from random import Random
+
+from history import History
+from noise import FLIP_COOPERATE, FLIP_DEFECT, errorMask, errorRates
+from payoffs import PRISONERS_DILEMMA, PayoffMatrix
+from ringbuffer import RingBuffer
+import strategies
+
+# the points awarded for each pair of moves, as (player move, bot move): (player points, bot points)
+PAYOFFS = PRISONERS_DILEMMA
+
+class Side:
+
+    def __init__(self, strategy, rng, runs, window=6, noise=None):
+        """ holds one side of a match: the strategy playing it, its bit-packed move
+        history and score, and the state that the AI strategies keep between rounds.
+        window is the number of recent scores the adaptive strategy averages. The
+        strategy may be given by its registered name. noise gives the chances of a
+        move being played as the other one, as described in noise.py """
+        if strategy is not None:
+            strategy = strategies.resolve(strategy)
+        self.strategy = strategy
+        self.rng = rng
+        self.history = History()
+        self.score = 0
+        self.move = ""
+
+        # state used by the grudge, random tit-for-tat and adaptive strategies
+        self.grudge = False
+        self.randCount = 1
+        self.randMoves = rng.randint(1, runs)
+        self.window = window
+        self.cAvg = RingBuffer(window)
+        self.dAvg = RingBuffer(window)
+
+        # the rounds in which this side's moves come out wrong are drawn up front.
+        # Without noise nothing is drawn, so the match plays out as it always has
+        self.noise = noise
+        self.errors = None
+        if errorRates(noise) != (0.0, 0.0):
+            self.errors = errorMask(runs, noise, rng)
+
+    def play(self, move):
+        """ records the move made by this side this round. With noise, the move
+        recorded may be the opposite of the one given """
+        if self.errors is not None:
+            move = self.perturb(move)
+        self.move = move
+        self.history.append(move)
+        return move
+
+    def perturb(self, move):
+        """ returns the move that comes out this round when the side means to play move """
+        round = self.history.length
+        if round >= len(self.errors):
+            # the game plays a round past its runs, so more rounds are drawn as needed
+            self.errors += errorMask(len(self.errors) + 1, self.noise, self.rng)
+        flips = self.errors[round]
+        if not flips:
+            return move
+        if move == 'C' and flips & FLIP_COOPERATE:
+            return 'D'
+        if move == 'D' and flips & FLIP_DEFECT:
+            return 'C'
+        return move
+
+    def implementAdaptive(self, opponentMove):
+        """ stores this side's score in the rolling averages used by the adaptive
+        strategy, under the move the opponent just made """
+        if opponentMove == 'C':
+            self.cAvg.append(self.score)
+        else:
+            self.dAvg.append(self.score)
+
+class Match:
+
+    def __init__(self, playerStrategy, botStrategy, runs, payoffs=PAYOFFS, rng=None, window=6,
+                 simultaneous=False, noise=None):
+        """ sets up a match of the given number of runs between two strategies. Either
+        strategy may be None when its moves are supplied from outside, as the Game
+        does with the human player's clicks. window sets how many recent scores the
+        adaptive strategy averages. Normally the bot moves after seeing the player's
+        move, as in the game; a simultaneous match has both sides choose their moves
+        from the earlier rounds only. payoffs may be a PayoffMatrix or a dictionary
+        of (player move, bot move): (player points, bot points), which is checked here.
+        noise makes both sides' moves sometimes come out as the other move """
+        if rng is None:
+            rng = Random()
+        self.rng = rng
+        self.runs = runs
+        self.payoffs = PayoffMatrix.of(payoffs)
+        self.points = self.payoffs.points
+        self.round = 1
+        self.simultaneous = simultaneous
+        self.player = Side(playerStrategy, rng, runs, window, noise)
+        self.bot = Side(botStrategy, rng, runs, window, noise)
+
+    def playerTurn(self, move=None):
+        """ makes the player's move for this round, asking the player's strategy
+        when no move is given """
+        if move is None:
+            move = self.player.strategy(self.player, self.bot)
+        return self.player.play(move)
+
+    def botTurn(self, move=None):
+        """ makes the bot's move for this round. The bot moves after the player, so
+        its strategy can already see the player's move for this round """
+        if move is None:
+            move = self.bot.strategy(self.bot, self.player)
+        return self.bot.play(move)
+
+    def scoreRound(self):
+        """ adds the points for the moves both sides made this round and
+        moves on to the next round """
+        playerPoints, botPoints = self.points[(self.player.move, self.bot.move)]
+        self.player.score += playerPoints
+        self.bot.score += botPoints
+        self.player.implementAdaptive(self.bot.move)
+        self.bot.implementAdaptive(self.player.move)
+        self.round += 1
+        return playerPoints, botPoints
+
+    def playRound(self):
+        """ plays a single round of the match """
+        if self.simultaneous:
+            playerMove = self.player.strategy(self.player, self.bot)
+            botMove = self.bot.strategy(self.bot, self.player)
+            self.player.play(playerMove)
+            self.bot.play(botMove)
+        else:
+            self.playerTurn()
+            self.botTurn()
+        return self.scoreRound()
+
+    def isOver(self):
+        return self.round > self.runs
+
+    def play(self):
+        """ plays every remaining round of the match """
+        while self.round <= self.runs:
+            self.playRound()
+        return self
+
+def playMatch(playerStrategy, botStrategy, runs, payoffs=PAYOFFS, rng=None, window=6,
+              simultaneous=False, noise=None):
+    """ plays a whole match between two strategies, returning the finished match
+    with both sides' histories and scores """
+    return Match(playerStrategy, botStrategy, runs, payoffs, rng, window, simultaneous, noise).play()
@@ -0,0 +1,150 @@
+# Finite State Machines
+# Tit-for-tat, grudge and random tit-for-tat only remember a little about
+# the match, so each can be written as a small finite state machine: every
+# state has a move to play, and the opponent's move in a round decides the
+# state for the next round. This module compiles such machines into
+# transition tables and steps whole populations of them at once with
+# NumPy, so that tournaments between thousands of machines are array
+# lookups rather than a Python call per move.
+#
+# The machines play the usual simultaneous game, where each side only sees
+# the opponent's earlier moves. That is how the strategies in strategies.py
+# play when they move first in a match.
+
+import numpy as np
+
+from engine import PAYOFFS
+from tournament import COOPERATE, DEFECT, payoffTable
+
+# the move a state plays when it picks between cooperating and defecting at random
+RANDOM = 2
+
+_MOVES = {'C': COOPERATE, 'D': DEFECT, 'R': RANDOM}
+
+class Machine:
+
+    def __init__(self, name, actions, transitions):
+        """ holds a compiled machine: actions[state] is the move played in a state
+        and transitions[state, opponent move] is the state for the next round.
+        State 0 is where every match starts """
+        self.name = name
+        self.actions = actions
+        self.transitions = transitions
+
+    def __len__(self):
+        return len(self.actions)
+
+    def table(self):
+        """ returns the machine as a (states, 2, 2) array holding, for each state and
+        opponent move, the next state and the move that state plays """
+        table = np.zeros((len(self.actions), 2, 2), dtype=np.int32)
+        table[:, :, 0] = self.transitions
+        table[:, :, 1] = self.actions[self.transitions]
+        return table
+
+def compileMachine(name, states):
+    """ compiles a machine from a dictionary of state name: (move, next state when the
+    opponent cooperates, next state when the opponent defects). Moves are 'C', 'D' or
+    'R' for random, and the first state listed is the starting state """
+    index = {}
+    for stateName in states:
+        index[stateName] = len(index)
+    actions = np.zeros(len(states), dtype=np.int8)
+    transitions = np.zeros((len(states), 2), dtype=np.int32)
+    for stateName, (move, onCooperate, onDefect) in states.items():
+        if move not in _MOVES:
+            raise ValueError("state %r plays unknown move %r" % (stateName, move))
+        for nextState in (onCooperate, onDefect):
+            if nextState not in index:
+                raise ValueError("state %r moves to unknown state %r" % (stateName, nextState))
+        i = index[stateName]
+        actions[i] = _MOVES[move]
+        transitions[i, COOPERATE] = index[onCooperate]
+        transitions[i, DEFECT] = index[onDefect]
+    return Machine(name, actions, transitions)
+
+def titForTatMachine():
+    """ cooperates first, then plays whatever the opponent played last round """
+    return compileMachine("titForTat", {"cooperate": ('C', "cooperate", "defect"),
+                                        "defect": ('D', "cooperate", "defect")})
+
+def grudgeMachine():
+    """ cooperates until the opponent defects, then defects for good """
+    return compileMachine("grudges", {"friendly": ('C', "friendly", "grudge"),
+                                      "grudge": ('D', "grudge", "grudge")})
+
+def randomTitForTatMachine(randMoves):
+    """ plays tit-for-tat, but plays randomly on every round that is a multiple of
+    randMoves. The states count the rounds around that cycle along with the
+    opponent's last move """
+    states = {}
+    for count in range(randMoves):
+        nextCount = (count + 1) % randMoves
+        for last in ('C', 'D'):
+            move = last
+            if (count + 1) % randMoves == 0:
+                move = 'R'
+            states["%d%s" % (count, last)] = (move, "%dC" % nextCount, "%dD" % nextCount)
+    return compileMachine("randomTitForTat", states)
+
+class Population:
+
+    def __init__(self, machines):
+        """ joins the machines into one table so that players running different
+        machines can be stepped together. players[i] is the machine of player i """
+        self.players = list(machines)
+        self.starts = np.zeros(len(self.players), dtype=np.int32)
+        actions = []
+        transitions = []
+        offset = 0
+        offsets = {}
+        for i, machine in enumerate(self.players):
+            # machines shared by several players are only stored once
+            if id(machine) not in offsets:
+                offsets[id(machine)] = offset
+                actions.append(machine.actions)
+                transitions.append(machine.transitions + offset)
+                offset += len(machine)
+            self.starts[i] = offsets[id(machine)]
+        self.actions = np.concatenate(actions)
+        self.transitions = np.concatenate(transitions)
+
+    def play(self, first, second, runs, payoffs=PAYOFFS, rng=None):
+        """ plays a match of the given number of runs between each pair of players
+        first[k] and second[k] at once, returning the scores of both sides """
+        if rng is None:
+            rng = np.random.default_rng()
+        table = payoffTable(payoffs)
+        first = np.asarray(first)
+        second = np.asarray(second)
+        stateA = self.starts[first]
+        stateB = self.starts[second]
+        scoreA = np.zeros(len(first), dtype=table.dtype)
+        scoreB = np.zeros(len(first), dtype=table.dtype)
+        for round in range(runs):
+            moveA = self._moves(stateA, rng)
+            moveB = self._moves(stateB, rng)
+            points = table[moveA, moveB]
+            scoreA += points[:, 0]
+            scoreB += points[:, 1]
+            stateA = self.transitions[stateA, moveB]
+            stateB = self.transitions[stateB, moveA]
+        return scoreA, scoreB
+
+    def roundRobin(self, runs, payoffs=PAYOFFS, rng=None):
+        """ plays every player against every other player and itself, returning each
+        player's total score """
+        first, second = np.triu_indices(len(self.players))
+        scoreA, scoreB = self.play(first, second, runs, payoffs, rng)
+        totals = np.bincount(first, weights=scoreA, minlength=len(self.players))
+        totals += np.bincount(second, weights=scoreB, minlength=len(self.players))
+        return totals
+
+    def _moves(self, states, rng):
+        # looks up every player's move, drawing coin flips for the random states
+        moves = self.actions[states]
+        random = moves == RANDOM
+        if random.any():
+            moves = moves.copy()
+            moves[random] = rng.integers(0, 2, size=int(random.sum()))
+        return moves
@@ -62,6 +62,31 @@ http://mcsp.wartburg.edu/zelle/python for a quick reference"""
 
 __version__ = "4.3"
 
+# Changes made for the Prisoner's Dilemma game
+#     * getMouse and getKey wait on Tk's own event loop for queued clicks
+#       and key presses instead of polling every 100ms. Click listeners
+#       can be added with addClickListener.
+#     * Added GraphWin.frame, a with block that collects drawing changes
+#       and shows them with one update when it ends.
+#     * GraphWin keeps its drawn items in an insertion-ordered dict, so
+#       undrawing is constant time. Objects can carry canvas tags, and
+#       undrawTag removes every item with a tag in one Tk delete.
+#     * Added drawGroup, hideTag and showTag, so a screen of tagged
+#       objects can be drawn once and then hidden and shown again with a
+#       single itemconfigure instead of being rebuilt.
+#     * Added clickable regions. addRegion registers a Rectangle with a
+#       handler, and hitTest and getRegion find the region under a click
+#       through a grid of buckets rather than testing every region.
+#     * Added Image.setPixels, setRow and getPixels, which move whole
+#       blocks of RGB bytes in one Tk call, and GraphWin.plotPixels,
+#       which plots many points at once into a single image.
+#     * The Tk root is created by the first window or image that needs
+#       it rather than on import, so the module imports without a
+#       display. Added HeadlessWin, a GraphWin that records its canvas
+#       calls instead of drawing them.
+#     * setProfiler hands the module an object whose count method is
+#       called for every window update and canvas item created or deleted.
+#
 # Version 4.3 4/25/2014
 #     * Fixed Image getPixel to work with Python 3.4, TK 8.6 (tuple type handling)
 #     * Added interactive keyboard input (getKey and checkKey) to GraphWin
@@ -154,6 +179,8 @@ __version__ = "4.3"
 #     Added Entry boxes.
 
 import time, os, sys
+from collections import deque
+from contextlib import contextmanager
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
@@ -173,11 +200,37 @@ UNSUPPORTED_METHOD = "Object doesn't support operation"
 BAD_OPTION = "Illegal option value"
 DEAD_THREAD = "Graphics thread quit unexpectedly"
 
-_root = tk.Tk()
-_root.withdraw()
+_root = None    # the hidden Tk root, created by _getRoot when first needed
+
+def _getRoot():
+    # creates the shared Tk root the first time a window, image or entry
+    # needs it, so that importing the module does not start Tk
+    global _root
+    if _root is None:
+        _root = tk.Tk()
+        _root.withdraw()
+    return _root
 
 def update():
-    _root.update()
+    if _root is not None:
+        _count("update")
+        _root.update()
+
+_profiler = None    # counts updates, creates and deletes when set
+
+def setProfiler(profiler):
+    """Call profiler.count(name, n) for every window update ("update")
+    and canvas item created ("create") or deleted ("delete"). None
+    stops the counting"""
+    global _profiler
+    _profiler = profiler
+
+def _count(name, n=1):
+    if _profiler is not None:
+        _profiler.count(name, n)
+
+# size in pixels of the grid cells used to find clickable regions
+REGION_CELL = 64
 
 ############################################################################
 # Graphics classes start here
@@ -188,27 +241,47 @@ class GraphWin(tk.Canvas):
 
     def __init__(self, title="Graphics Window",
                  width=200, height=200, autoflush=True):
-        master = tk.Toplevel(_root)
+        master = tk.Toplevel(_getRoot())
         master.protocol("WM_DELETE_WINDOW", self.close)
         tk.Canvas.__init__(self, master, width=width, height=height)
         self.master.title(title)
         self.pack()
         master.resizable(0,0)
+        self._inputReady = tk.BooleanVar(master, False)
+        self.bind("<Button-1>", self._onClick)
+        self.bind_all("<Key>", self._onKey)
+        self._initState(width, height, autoflush)
+        master.lift()
+        if autoflush: self.update()
+
+    def _initState(self, width, height, autoflush):
+        # sets up everything the window keeps track of besides its Tk widgets
         self.foreground = "black"
-        self.items = []
+        self.items = {}     # drawn objects, in drawing order (values unused)
+        self.tagged = {}    # tag -> dict of the drawn objects carrying it
+        self.hidden = set() # tags whose objects are drawn but hidden
+        self.regions = {}   # region key -> (rectangle, handler, screen bounds)
+        self.buckets = {}   # grid cell -> keys of the regions overlapping it
+        self.nextRegion = 0
+        self.pixelLayer = None  # Image that plotPixels draws into
         self.mouseX = None
         self.mouseY = None
-        self.bind("<Button-1>", self._onClick)
-        self.bind_all("<Key>", self._onKey)
+
+        # clicks and key presses are queued by the Tk event handlers, and waiting
+        # for input blocks in Tk's event loop until _inputReady is set. Only the
+        # most recent input is kept when nothing is reading it
+        self._clicks = deque(maxlen=64)
+        self._keys = deque(maxlen=64)
+        self._clickListeners = []
         self.height = height
         self.width = width
         self.autoflush = autoflush
+        self._frameDepth = 0
+        self._frameAutoflush = autoflush
         self._mouseCallback = None
         self.trans = None
         self.closed = False
-        master.lift()
         self.lastKey = ""
-        if autoflush: _root.update()
      
     def __checkOpen(self):
         if self.closed:
@@ -216,6 +289,16 @@ class GraphWin(tk.Canvas):
 
     def _onKey(self, evnt):
         self.lastKey = evnt.keysym
+        self._keys.append(evnt.keysym)
+        self._inputReady.set(True)
+
+    def _waitForInput(self, queue, what):
+        # runs Tk's event loop until an event handler or close() sets _inputReady,
+        # so the wait wakes as soon as input arrives rather than on a timer
+        while not queue:
+            if self.isClosed(): raise GraphicsError(what + " in closed window")
+            self._inputReady.set(False)
+            self.wait_variable(self._inputReady)
 
 
     def setBackground(self, color):
@@ -228,7 +311,11 @@ class GraphWin(tk.Canvas):
         """Set coordinates of window to run from (x1,y1) in the
         lower-left corner to (x2,y2) in the upper-right corner."""
         self.trans = Transform(self.width, self.height, x1, y1, x2, y2)
+        if self.pixelLayer:
+            # the plotted pixels stay where they are on the screen
+            self.pixelLayer.anchor = Point(*self.toWorld(self.width/2, self.height/2))
         self.redraw()
+        self._indexRegions()
 
     def close(self):
         """Close the window"""
@@ -236,6 +323,7 @@ class GraphWin(tk.Canvas):
         if self.closed: return
         self.closed = True
         self.master.destroy()
+        self._inputReady.set(True) # wake anything waiting for input
         self.__autoflush()
 
 
@@ -249,7 +337,7 @@ class GraphWin(tk.Canvas):
 
     def __autoflush(self):
         if self.autoflush:
-            _root.update()
+            self.update()
 
     
     def plot(self, x, y, color="black"):
@@ -266,25 +354,64 @@ class GraphWin(tk.Canvas):
         self.create_line(x,y,x+1,y, fill=color)
         self.__autoflush()
       
+    def plotPixels(self, points, color="black"):
+        """Set every (x,y) pair in points to color. The points go into
+        a single window-sized image beneath the other objects, all with
+        one Tk call, rather than becoming a canvas item each"""
+        self.__checkOpen()
+        if self.pixelLayer is None:
+            self.pixelLayer = Image(Point(0,0), self.width, self.height)
+            self.pixelLayer.anchor = Point(*self.toWorld(self.width/2, self.height/2))
+            self.pixelLayer.draw(self)
+            self.tag_lower(self.pixelLayer.id)
+        name = self.pixelLayer.img.name
+        commands = []
+        for x,y in points:
+            xs,ys = self.toScreen(x,y)
+            xs = int(xs)
+            ys = int(ys)
+            if 0 <= xs < self.width and 0 <= ys < self.height:
+                commands.append("%s put {%s} -to %d %d" % (name, color, xs, ys))
+        if commands:
+            self.tk.eval("\n".join(commands))
+        self.__autoflush()
+
+    def update(self):
+        """Process pending events and redraw the window"""
+        _count("update")
+        tk.Canvas.update(self)
+
     def flush(self):
         """Update drawing to the window"""
         self.__checkOpen()
         self.update_idletasks()
+
+    @contextmanager
+    def frame(self):
+        """Collect the drawing changes made inside a with block and
+        show them all with a single update when the block ends, rather
+        than updating after each one. Frames may be nested; only the
+        outermost one updates"""
+        self._frameDepth += 1
+        if self._frameDepth == 1:
+            self._frameAutoflush = self.autoflush
+            self.autoflush = False
+        try:
+            yield self
+        finally:
+            self._frameDepth -= 1
+            if self._frameDepth == 0:
+                self.autoflush = self._frameAutoflush
+                if self.autoflush and not self.closed:
+                    self.update()
         
     def getMouse(self):
         """Wait for mouse click and return Point object representing
         the click"""
         self.update()      # flush any prior clicks
-        self.mouseX = None
-        self.mouseY = None
-        while self.mouseX == None or self.mouseY == None:
-            self.update()
-            if self.isClosed(): raise GraphicsError("getMouse in closed window")
-            time.sleep(.1) # give up thread
-        x,y = self.toWorld(self.mouseX, self.mouseY)
-        self.mouseX = None
-        self.mouseY = None
-        return Point(x,y)
+        self._clicks.clear()
+        self._waitForInput(self._clicks, "getMouse")
+        return self._nextClick()
 
     def checkMouse(self):
         """Return last mouse click or None if mouse has
@@ -292,25 +419,26 @@ class GraphWin(tk.Canvas):
         if self.isClosed():
             raise GraphicsError("checkMouse in closed window")
         self.update()
-        if self.mouseX != None and self.mouseY != None:
-            x,y = self.toWorld(self.mouseX, self.mouseY)
-            self.mouseX = None
-            self.mouseY = None
-            return Point(x,y)
+        if self._clicks:
+            return self._nextClick()
         else:
             return None
 
+    def _nextClick(self):
+        # takes the oldest queued click, converted to world coordinates
+        xs,ys = self._clicks.popleft()
+        self.mouseX = None
+        self.mouseY = None
+        x,y = self.toWorld(xs, ys)
+        return Point(x,y)
+
     def getKey(self):
         """Wait for user to press a key and return it as a string."""
         self.lastKey = ""
-        while self.lastKey == "":
-            self.update()
-            if self.isClosed(): raise GraphicsError("getKey in closed window")
-            time.sleep(.1) # give up thread
-
-        key = self.lastKey
+        self._keys.clear()
+        self._waitForInput(self._keys, "getKey")
         self.lastKey = ""
-        return key
+        return self._keys.popleft()
 
     def checkKey(self):
         """Return last key pressed or None if no key pressed since last call"""
@@ -319,6 +447,7 @@ class GraphWin(tk.Canvas):
         self.update()
         key = self.lastKey
         self.lastKey = ""
+        self._keys.clear()
         return key
             
     def getHeight(self):
@@ -345,26 +474,262 @@ class GraphWin(tk.Canvas):
         
     def setMouseHandler(self, func):
         self._mouseCallback = func
+
+    def addClickListener(self, func):
+        """Call func with a Point (in the coordinates set by setCoords)
+        for every click, as Tk delivers it"""
+        self._clickListeners.append(func)
+
+    def removeClickListener(self, func):
+        self._clickListeners.remove(func)
         
+    def addRegion(self, rect, handler):
+        """Make the area covered by rect (a Rectangle or other
+        bounding-box object) clickable, returning a key for
+        removeRegion. hitTest returns handler for clicks inside it
+        while rect is drawn in this window and not hidden. Regions
+        added later lie on top of earlier ones. The region keeps the
+        bounds rect had when it was added"""
+        key = self.nextRegion
+        self.nextRegion += 1
+        self.regions[key] = (rect, handler, self._screenBounds(rect))
+        self._bucketRegion(key)
+        return key
+
+    def removeRegion(self, key):
+        """Stop the region with the given key from being clickable"""
+        rect, handler, bounds = self.regions.pop(key)
+        for cell in self._cells(bounds):
+            self.buckets[cell].remove(key)
+            if not self.buckets[cell]:
+                del self.buckets[cell]
+
+    def hitTest(self, p):
+        """Return the handler of the topmost clickable region
+        containing the point p, or None when there is none"""
+        xs,ys = self.toScreen(p.x, p.y)
+        cell = (int(xs // REGION_CELL), int(ys // REGION_CELL))
+        for key in sorted(self.buckets.get(cell, ()), reverse=True):
+            rect, handler, (x1,y1,x2,y2) = self.regions[key]
+            if x1 <= xs <= x2 and y1 <= ys <= y2 and rect.canvas is self \
+               and not self.hidden.intersection(rect.tags):
+                return handler
+        return None
+
+    def getRegion(self):
+        """Wait for a click on a clickable region and return its
+        handler, ignoring clicks anywhere else"""
+        while True:
+            handler = self.hitTest(self.getMouse())
+            if handler is not None:
+                return handler
+
+    def _screenBounds(self, rect):
+        # the region's corners in screen coordinates, smallest first
+        x1,y1 = self.toScreen(rect.p1.x, rect.p1.y)
+        x2,y2 = self.toScreen(rect.p2.x, rect.p2.y)
+        return min(x1,x2), min(y1,y2), max(x1,x2), max(y1,y2)
+
+    def _cells(self, bounds):
+        # every grid cell the bounds overlap
+        x1,y1,x2,y2 = bounds
+        for cx in range(int(x1 // REGION_CELL), int(x2 // REGION_CELL) + 1):
+            for cy in range(int(y1 // REGION_CELL), int(y2 // REGION_CELL) + 1):
+                yield cx,cy
+
+    def _bucketRegion(self, key):
+        for cell in self._cells(self.regions[key][2]):
+            self.buckets.setdefault(cell, []).append(key)
+
+    def _indexRegions(self):
+        # recomputes every region's screen bounds after the coordinates change
+        self.buckets = {}
+        for key, (rect, handler, bounds) in list(self.regions.items()):
+            self.regions[key] = (rect, handler, self._screenBounds(rect))
+            self._bucketRegion(key)
+
     def _onClick(self, e):
         self.mouseX = e.x
         self.mouseY = e.y
+        self._clicks.append((e.x, e.y))
+        self._inputReady.set(True)
         if self._mouseCallback:
             self._mouseCallback(Point(e.x, e.y))
+        if self._clickListeners:
+            x,y = self.toWorld(e.x, e.y)
+            for func in self._clickListeners[:]:
+                func(Point(x,y))
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[item] = None
+        for tag in item.tags:
+            self.tagged.setdefault(tag, {})[item] = None
 
     def delItem(self, item):
-        self.items.remove(item)
+        self.items.pop(item, None)
+        for tag in item.tags:
+            group = self.tagged.get(tag)
+            if group is not None:
+                group.pop(item, None)
+
+    def undrawTag(self, tag):
+        """Undraw every object carrying tag with a single canvas delete"""
+        self.hidden.discard(tag)
+        group = self.tagged.pop(tag, None)
+        if not group: return
+        self.__checkOpen()
+        self.delete(tag)
+        _count("delete", len(group))
+        for item in group:
+            self.delItem(item)
+            item._detach()
+        self.__autoflush()
+
+    def drawGroup(self, tag, objects):
+        """Tag each of objects with tag and draw them all, showing
+        them with a single update"""
+        with self.frame():
+            for obj in objects:
+                obj.addTag(tag)
+                obj.draw(self)
+
+    def hideTag(self, tag):
+        """Hide every object carrying tag without undrawing it, so
+        that it can be shown again with showTag"""
+        self.__checkOpen()
+        self.hidden.add(tag)
+        self.itemconfigure(tag, state="hidden")
+        self.__autoflush()
+
+    def showTag(self, tag):
+        """Show the objects carrying tag that were hidden by hideTag"""
+        self.__checkOpen()
+        self.hidden.discard(tag)
+        self.itemconfigure(tag, state="normal")
+        self.__autoflush()
 
     def redraw(self):
-        for item in self.items[:]:
+        for item in list(self.items):
             item.undraw()
             item.draw(self)
         self.update()
         
                       
+class HeadlessWin(GraphWin):
+
+    """A GraphWin that needs no display. Nothing is drawn: each
+    canvas call is recorded in calls as a (name, args, options)
+    tuple. Clicks and key presses are scripted with click and press,
+    and are delivered one at a time whenever the window waits for
+    input. Images and Entry boxes still need Tk."""
+
+    def __init__(self, title="Graphics Window",
+                 width=200, height=200, autoflush=True):
+        self.title = title
+        self.calls = []
+        self.nextId = 0
+        self.script = deque()   # scripted input events, oldest first
+        self._inputReady = _Flag()
+        self._initState(width, height, autoflush)
+
+    def _record(self, name, args, options):
+        # option dictionaries are copied, since objects keep changing theirs
+        args = tuple(dict(arg) if isinstance(arg, dict) else arg for arg in args)
+        self.calls.append((name, args, options))
+
+    def _create(self, name, args, options):
+        # records a call that makes a canvas item, returning a new item id
+        self.nextId += 1
+        self._record(name, args, options)
+        return self.nextId
+
+    def create_line(self, *args, **options):
+        return self._create("create_line", args, options)
+
+    def create_rectangle(self, *args, **options):
+        return self._create("create_rectangle", args, options)
+
+    def create_oval(self, *args, **options):
+        return self._create("create_oval", args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._create("create_polygon", args, options)
+
+    def create_text(self, *args, **options):
+        return self._create("create_text", args, options)
+
+    def create_image(self, *args, **options):
+        return self._create("create_image", args, options)
+
+    def create_window(self, *args, **options):
+        return self._create("create_window", args, options)
+
+    def itemconfig(self, *args, **options):
+        self._record("itemconfig", args, options)
+
+    itemconfigure = itemconfig
+
+    def config(self, *args, **options):
+        self._record("config", args, options)
+
+    configure = config
+
+    def delete(self, *args):
+        self._record("delete", args, {})
+
+    def move(self, *args):
+        self._record("move", args, {})
+
+    def addtag_withtag(self, *args):
+        self._record("addtag_withtag", args, {})
+
+    def tag_lower(self, *args):
+        self._record("tag_lower", args, {})
+
+    def update(self):
+        _count("update")
+
+    def update_idletasks(self):
+        pass
+
+    def close(self):
+        """Close the window"""
+        self.closed = True
+        self._inputReady.set(True)
+
+    def click(self, x, y):
+        """Script a click at screen position (x,y)"""
+        self.script.append((self._onClick, _Event(x, y)))
+
+    def press(self, key):
+        """Script a press of the key with the given keysym"""
+        self.script.append((self._onKey, _Event(keysym=key)))
+
+    def _waitForInput(self, queue, what):
+        # delivers scripted events until one of the kind being waited for
+        # arrives. Nothing else can supply input, so running out fails
+        while not queue:
+            if self.isClosed(): raise GraphicsError(what + " in closed window")
+            if not self.script: raise GraphicsError(what + " with no input scripted")
+            handler, event = self.script.popleft()
+            handler(event)
+
+class _Flag:
+    # stands in for the BooleanVar a HeadlessWin has no Tk root to make
+    def __init__(self):
+        self.value = False
+    def set(self, value):
+        self.value = value
+    def get(self):
+        return self.value
+
+class _Event:
+    # the parts of a Tk event that the click and key handlers read
+    def __init__(self, x=0, y=0, keysym=""):
+        self.x = x
+        self.y = y
+        self.keysym = keysym
+
 class Transform:
 
     """Internal class for 2-D coordinate transformations"""
@@ -418,6 +783,7 @@ class GraphicsObject:
         #    drawn shape.
         self.canvas = None
         self.id = None
+        self.tags = []
 
         # config is the dictionary of configuration options for the widget.
         config = {}
@@ -437,6 +803,16 @@ class GraphicsObject:
         """Set line weight to width"""
         self._reconfig("width", width)
 
+    def addTag(self, tag):
+        """Add a canvas tag to the object, so that it can be handled
+        together with the other objects carrying the same tag"""
+        if tag in self.tags: return
+        self.tags.append(tag)
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            canvas.addtag_withtag(tag, self.id)
+            canvas.tagged.setdefault(tag, {})[self] = None
+
     def draw(self, graphwin):
 
         """Draw the object in graphwin, which should be a GraphWin
@@ -448,9 +824,14 @@ class GraphicsObject:
         if graphwin.isClosed(): raise GraphicsError("Can't draw to closed window")
         self.canvas = graphwin
         self.id = self._draw(graphwin, self.config)
+        _count("create")
+        if self.tags:
+            graphwin.itemconfig(self.id, tags=tuple(self.tags))
+            if graphwin.hidden.intersection(self.tags):
+                graphwin.itemconfig(self.id, state="hidden")
         graphwin.addItem(self)
         if graphwin.autoflush:
-            _root.update()
+            graphwin.update()
 
             
     def undraw(self):
@@ -461,9 +842,14 @@ class GraphicsObject:
         if not self.canvas: return
         if not self.canvas.isClosed():
             self.canvas.delete(self.id)
+            _count("delete")
             self.canvas.delItem(self)
             if self.canvas.autoflush:
-                _root.update()
+                self.canvas.update()
+        self._detach()
+
+    def _detach(self):
+        # forgets the canvas item once it has been deleted
         self.canvas = None
         self.id = None
 
@@ -485,7 +871,7 @@ class GraphicsObject:
                 y = dy
             self.canvas.move(self.id, x, y)
             if canvas.autoflush:
-                _root.update()
+                canvas.update()
            
     def _reconfig(self, option, setting):
         # Internal method for changing configuration of the object
@@ -498,7 +884,7 @@ class GraphicsObject:
         if self.canvas and not self.canvas.isClosed():
             self.canvas.itemconfig(self.id, options)
             if self.canvas.autoflush:
-                _root.update()
+                self.canvas.update()
 
 
     def _draw(self, canvas, options):
@@ -656,13 +1042,13 @@ class Polygon(GraphicsObject):
             p.move(dx,dy)
    
     def _draw(self, canvas, options):
-        args = [canvas]
+        args = []
         for p in self.points:
             x,y = canvas.toScreen(p.x,p.y)
             args.append(x)
             args.append(y)
         args.append(options)
-        return GraphWin.create_polygon(*args) 
+        return canvas.create_polygon(*args) 
 
 class Text(GraphicsObject):
     
@@ -727,7 +1113,7 @@ class Entry(GraphicsObject):
         self.anchor = p.clone()
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = tk.StringVar(_getRoot())
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -818,10 +1204,10 @@ class Image(GraphicsObject):
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
         if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+            self.img = tk.PhotoImage(file=pixmap[0], master=_getRoot())
         else: # width and height provided
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = tk.PhotoImage(master=_getRoot(), width=width, height=height)
                 
     def _draw(self, canvas, options):
         p = self.anchor
@@ -832,12 +1218,12 @@ class Image(GraphicsObject):
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
         
-    def undraw(self):
+    def _detach(self):
         try:
             del self.imageCache[self.imageId]  # allow gc of tk photoimage
         except KeyError:
             pass
-        GraphicsObject.undraw(self)
+        GraphicsObject._detach(self)
 
     def getAnchor(self):
         return self.anchor.clone()
@@ -876,8 +1262,39 @@ class Image(GraphicsObject):
         
         """
         self.img.put("{" + color +"}", (x, y))
+
+    def setPixels(self, x, y, width, height, data):
+        """Sets the width by height block of pixels whose top left
+        corner is (x,y) from data, a bytes-like object holding the red,
+        green and blue bytes of each pixel, row by row. The block is
+        handed to Tk as a single PPM image"""
+        data = memoryview(data).cast("B")
+        if len(data) != width * height * 3:
+            raise GraphicsError("pixel data does not match a %dx%d block" % (width, height))
+        ppm = b"P6\n%d %d\n255\n" % (width, height) + data.tobytes()
+        self.img.tk.call(self.img.name, "put", ppm, "-format", "ppm", "-to", x, y)
+
+    def setRow(self, y, data, x=0):
+        """Sets a row of pixels starting at (x,y) from data, a
+        bytes-like object holding the red, green and blue bytes of
+        each pixel"""
+        width = len(memoryview(data).cast("B")) // 3
+        self.setPixels(x, y, width, 1, data)
+
+    def getPixels(self, x=0, y=0, width=None, height=None):
+        """Returns the width by height block of pixels whose top left
+        corner is (x,y), the whole image by default, as a bytearray of
+        red, green and blue bytes, row by row. It can be wrapped without
+        copying, for example with numpy.frombuffer(data, numpy.uint8)"""
+        if width is None:
+            width = self.getWidth() - x
+        if height is None:
+            height = self.getHeight() - y
+        value = self.img.tk.call(self.img.name, "data", "-from", x, y, x + width, y + height)
+        return bytearray.fromhex(_hexPixels(value))
         
 
+
     def save(self, filename):
         """Saves the pixmap image to filename.
         The format for the save image is determined from the filname extension.
@@ -889,6 +1306,13 @@ class Image(GraphicsObject):
         self.img.write( filename, format=ext)
 
         
+def _hexPixels(value):
+    # turns the rows of "#rrggbb" colors returned by a photo image's data
+    # command, as a string or as nested tuples, into one string of hex digits
+    if isinstance(value, tuple):
+        return " ".join(_hexPixels(row) for row in value)
+    return str(value).replace("#", "").replace("{", "").replace("}", "")
+
 def color_rgb(r,g,b):
     """r,g,b are intensities of red, green, and blue in range(256)
     Returns color specifier string for the resulting color"""
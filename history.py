@@ -0,0 +1,87 @@
+# History
+# A compact record of one side's moves in a match. Moves are packed one bit
+# each into a bytearray (0 for cooperate, 1 for defect), and running counts
+# of cooperations and defections are kept as moves are added, so long
+# matches cost an eighth of a byte per move.
+
+# the eight moves held by each possible byte, first move first
+_BYTE_MOVES = ["".join('D' if byte >> bit & 1 else 'C' for bit in range(8)) for byte in range(256)]
+
+class History:
+
+    def __init__(self, moves=""):
+        """ creates a history, optionally filled with a string or list of 'C' and 'D' moves """
+        self.bits = bytearray()
+        self.length = 0
+        self.defects = 0
+        self.cooperates = 0
+        for move in moves:
+            self.append(move)
+
+    @classmethod
+    def fromBits(cls, bits, length):
+        """ rebuilds a history from its packed bytes and number of moves """
+        history = cls()
+        history.bits = bytearray(bits[:(length + 7) >> 3])
+        history.length = length
+        if length & 7:
+            history.bits[-1] &= (1 << (length & 7)) - 1
+        history.defects = sum(bin(byte).count("1") for byte in history.bits)
+        history.cooperates = length - history.defects
+        return history
+
+    def append(self, move):
+        """ adds a move to the end of the history """
+        index = self.length
+        if index & 7 == 0:
+            self.bits.append(0)
+        if move == 'D':
+            self.bits[index >> 3] |= 1 << (index & 7)
+            self.defects += 1
+        else:
+            self.cooperates += 1
+        self.length = index + 1
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        """ returns the move at the given index as 'C' or 'D', counting from the end
+        for negative indexes. Slices return the moves as a string """
+        if isinstance(index, slice):
+            return self.moves()[index]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("history index out of range")
+        if self.bits[index >> 3] >> (index & 7) & 1:
+            return 'D'
+        return 'C'
+
+    def __iter__(self):
+        return iter(self.moves())
+
+    def last(self, k=1):
+        """ returns the last k moves as a string, oldest first """
+        if k <= 0:
+            return ""
+        start = max(self.length - k, 0)
+        first = start >> 3
+        moves = "".join([_BYTE_MOVES[byte] for byte in self.bits[first:]])
+        return moves[start - (first << 3):self.length - (first << 3)]
+
+    def moves(self):
+        """ returns every move as a string such as "CDC" """
+        return "".join([_BYTE_MOVES[byte] for byte in self.bits])[:self.length]
+
+    def __str__(self):
+        """ returns the moves separated by spaces, as the end screen displays them """
+        return " ".join(self.moves())
+
+    def __repr__(self):
+        return "History(%r)" % self.moves()
+
+    def __eq__(self, other):
+        if isinstance(other, History):
+            return self.length == other.length and self.bits == other.bits
+        return NotImplemented
@@ -0,0 +1,133 @@
+# Markov Evaluation
+# A memory-one strategy decides each move only from the moves both sides
+# made in the previous round, so a match between two of them is a Markov
+# chain over the four outcomes CC, CD, DC and DD. Walking the chain gives
+# the exact expected score of both sides, and the variance of those
+# scores, in a handful of small matrix products instead of simulating
+# thousands of matches. Pairings that include a strategy which
+# is not memory-one are estimated by simulating them with the engine.
+#
+# Like fsm.py, this models the simultaneous game, where neither side sees
+# the other's move for the round before making its own.
+
+from random import Random
+
+import numpy as np
+
+from engine import PAYOFFS, playMatch
+
+# the outcomes of a round, as (my move, opponent's move), in the order the chain uses them
+OUTCOMES = [('C', 'C'), ('C', 'D'), ('D', 'C'), ('D', 'D')]
+
+class MemoryOne:
+
+    def __init__(self, first, cooperate):
+        """ describes a memory-one strategy by the chance that it cooperates in the
+        first round and the chances that it cooperates after each outcome of the
+        previous round, listed in the order of OUTCOMES from its own point of view """
+        self.first = first
+        self.cooperate = tuple(cooperate)
+        if len(self.cooperate) != 4:
+            raise ValueError("a memory-one strategy needs a probability for each of the four outcomes")
+        for p in (first,) + self.cooperate:
+            if not 0 <= p <= 1:
+                raise ValueError("probabilities must be between 0 and 1")
+
+# the built-in strategies that are memory-one in the simultaneous game. The grudge
+# only ever defects once it holds a grudge, so any defection last round means defect
+MEMORY_ONE = {"randMove": MemoryOne(0.5, (0.5, 0.5, 0.5, 0.5)),
+              "titForTat": MemoryOne(1, (1, 0, 1, 0)),
+              "grudges": MemoryOne(1, (1, 0, 0, 0))}
+
+class Expectation:
+
+    def __init__(self, playerMean, botMean, playerVariance, botVariance, exact):
+        """ holds the expected scores of both sides of a pairing and their variances.
+        exact is False when they were estimated by simulation """
+        self.playerMean = playerMean
+        self.botMean = botMean
+        self.playerVariance = playerVariance
+        self.botVariance = botVariance
+        self.exact = exact
+
+def memoryOne(strategy):
+    """ returns the MemoryOne description of a strategy, given either as a MemoryOne
+    or by name, or None if it is not memory-one """
+    if isinstance(strategy, MemoryOne):
+        return strategy
+    return MEMORY_ONE.get(strategy)
+
+def chain(player, bot):
+    """ returns the distribution of the first round's outcome and the matrix of
+    chances of moving from each outcome to the next, with outcomes seen from the
+    player's side """
+    # the bot sees CD and DC the other way round
+    botView = [0, 2, 1, 3]
+    start = np.zeros(4)
+    matrix = np.zeros((4, 4))
+    for i, (playerMove, botMove) in enumerate(OUTCOMES):
+        pc = player.first if playerMove == 'C' else 1 - player.first
+        bc = bot.first if botMove == 'C' else 1 - bot.first
+        start[i] = pc * bc
+        for previous in range(4):
+            p = player.cooperate[previous]
+            b = bot.cooperate[botView[previous]]
+            pc = p if playerMove == 'C' else 1 - p
+            bc = b if botMove == 'C' else 1 - b
+            matrix[previous, i] = pc * bc
+    return start, matrix
+
+def exactScores(player, bot, runs, payoffs=PAYOFFS):
+    """ works out the mean and variance of both sides' scores after the given number
+    of runs. Alongside the chance of being in each outcome, the walk carries each
+    side's expected score and squared score to date within each outcome. One round
+    of that walk is a linear map, so all the rounds after the first are taken at
+    once with a matrix power, which keeps long matches as cheap as short ones """
+    start, matrix = chain(player, bot)
+    rewards = [np.array([payoffs[outcome][side] for outcome in OUTCOMES], dtype=float) for side in (0, 1)]
+
+    # the walk's state is laid out as the chances, then each side's expected score,
+    # then each side's expected squared score, four outcomes apiece
+    step = np.zeros((20, 20))
+    step[0:4, 0:4] = matrix
+    state = np.zeros(20)
+    state[0:4] = start
+    for side in (0, 1):
+        total = slice(4 + 4 * side, 8 + 4 * side)
+        square = slice(12 + 4 * side, 16 + 4 * side)
+        r = rewards[side]
+        step[total, total] = matrix
+        step[0:4, total] = matrix * r
+        step[square, square] = matrix
+        step[total, square] = 2 * matrix * r
+        step[0:4, square] = matrix * r ** 2
+        state[total] = start * r
+        state[square] = start * r ** 2
+
+    state = state @ np.linalg.matrix_power(step, runs - 1)
+    means = [state[4:8].sum(), state[8:12].sum()]
+    variances = [state[12:16].sum() - means[0] ** 2, state[16:20].sum() - means[1] ** 2]
+    return Expectation(float(means[0]), float(means[1]), float(variances[0]), float(variances[1]), True)
+
+def simulatedScores(player, bot, runs, payoffs=PAYOFFS, samples=10000, rng=None):
+    """ estimates the mean and variance of both sides' scores by playing the pairing
+    samples times with the engine """
+    if rng is None:
+        rng = Random()
+    playerScores = np.zeros(samples)
+    botScores = np.zeros(samples)
+    for n in range(samples):
+        match = playMatch(player, bot, runs, payoffs, rng, simultaneous=True)
+        playerScores[n] = match.player.score
+        botScores[n] = match.bot.score
+    return Expectation(float(playerScores.mean()), float(botScores.mean()),
+                       float(playerScores.var()), float(botScores.var()), False)
+
+def expectedScores(player, bot, runs, payoffs=PAYOFFS, samples=10000, rng=None):
+    """ returns the expected scores of a pairing, exactly when both strategies are
+    memory-one and by simulation otherwise """
+    playerChain = memoryOne(player)
+    botChain = memoryOne(bot)
+    if playerChain is not None and botChain is not None:
+        return exactScores(playerChain, botChain, runs, payoffs)
+    return simulatedScores(player, bot, runs, payoffs, samples, rng)
@@ -0,0 +1,196 @@
+# Match Log
+# A compact binary log of finished matches, for offline analysis and for
+# comparing the moves strategies make before and after a change. The file
+# starts with a short header, then holds one record per match:
+#
+#     rounds, both scores, the lengths of the two strategy names and the
+#     seed, and the eight payoffs (player, bot) for CC, CD, DC and DD
+#     the strategy names and seed as UTF-8 text
+#     the moves, two bits per round: the player's move in the low bit and
+#     the bot's in the high bit, 0 for cooperate and 1 for defect
+#
+# MatchLogWriter appends matches to a log as they finish. MatchLog reads a
+# log through a memory map, finding each record from the lengths in its
+# header and only unpacking the moves of the matches that are asked for,
+# so archives of millions of matches can be scanned without loading them.
+
+import mmap
+import os
+import struct
+
+from engine import PAYOFFS
+from history import History
+from payoffs import PayoffMatrix
+
+MAGIC = b"PDML"
+VERSION = 1
+
+_FILE_HEADER = struct.Struct("<4sH")
+_RECORD_HEADER = struct.Struct("<IiiHHH8i")
+
+# the moves of the four rounds held by each possible byte, as (player moves, bot moves)
+_BYTE_PAIRS = [("".join('D' if byte >> (2 * r) & 1 else 'C' for r in range(4)),
+                "".join('D' if byte >> (2 * r + 1) & 1 else 'C' for r in range(4)))
+               for byte in range(256)]
+
+def packMoves(playerHistory, botHistory):
+    """ packs both sides' moves, given as History objects or strings, into two bits per round """
+    playerMoves = playerHistory.moves() if isinstance(playerHistory, History) else playerHistory
+    botMoves = botHistory.moves() if isinstance(botHistory, History) else botHistory
+    if len(playerMoves) != len(botMoves):
+        raise ValueError("both sides must have played the same number of rounds")
+    packed = bytearray((len(playerMoves) + 3) >> 2)
+    for round in range(len(playerMoves)):
+        bits = (playerMoves[round] == 'D') | (botMoves[round] == 'D') << 1
+        packed[round >> 2] |= bits << (2 * (round & 3))
+    return packed
+
+def unpackMoves(packed, rounds):
+    """ returns the player's and bot's moves as strings from moves packed by packMoves """
+    pairs = [_BYTE_PAIRS[byte] for byte in packed]
+    playerMoves = "".join([pair[0] for pair in pairs])[:rounds]
+    botMoves = "".join([pair[1] for pair in pairs])[:rounds]
+    return playerMoves, botMoves
+
+class LoggedMatch:
+
+    def __init__(self, data, offset):
+        """ reads the header of the record at offset in data. The moves are only
+        unpacked when histories is called """
+        (self.rounds, self.playerScore, self.botScore, playerLength, botLength, seedLength,
+         *points) = _RECORD_HEADER.unpack_from(data, offset)
+        self.payoffs = PayoffMatrix({('C', 'C'): points[0:2], ('C', 'D'): points[2:4],
+                                     ('D', 'C'): points[4:6], ('D', 'D'): points[6:8]})
+        start = offset + _RECORD_HEADER.size
+        text = bytes(data[start:start + playerLength + botLength + seedLength]).decode("utf-8")
+        self.playerStrategy = text[:playerLength]
+        self.botStrategy = text[playerLength:playerLength + botLength]
+        self.seed = text[playerLength + botLength:] or None
+        self.data = data
+        self.movesOffset = start + playerLength + botLength + seedLength
+        self.end = self.movesOffset + ((self.rounds + 3) >> 2)
+
+    def packedMoves(self):
+        """ returns the record's packed moves """
+        return self.data[self.movesOffset:self.end]
+
+    def histories(self):
+        """ returns the player's and bot's move histories """
+        playerMoves, botMoves = unpackMoves(self.packedMoves(), self.rounds)
+        return History(playerMoves), History(botMoves)
+
+class MatchLogWriter:
+
+    def __init__(self, path, bufferSize=1 << 16):
+        """ opens the log at path for appending, writing the file header when the
+        log is new. Records are buffered and written in blocks of bufferSize bytes """
+        self.path = path
+        self.file = open(path, "ab", buffering=bufferSize)
+        if self.file.tell() == 0:
+            self.file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, player, bot, playerScore, botScore, playerHistory, botHistory,
+              seed=None, payoffs=PAYOFFS):
+        """ appends the result of a match. The histories may be History objects or
+        strings of moves. The log holds two-move games with whole-number payoffs """
+        payoffs = PayoffMatrix.of(payoffs)
+        if payoffs.moves != "CD" or not payoffs.isIntegral():
+            raise ValueError("the match log cannot hold the payoffs %s" % payoffs.text())
+        packed = packMoves(playerHistory, botHistory)
+        playerText = player.encode("utf-8")
+        botText = bot.encode("utf-8")
+        seedText = b""
+        if seed is not None:
+            seedText = str(seed).encode("utf-8")
+        points = []
+        for entry in payoffs.table:
+            points.extend(entry)
+        rounds = len(playerHistory)
+        self.file.write(_RECORD_HEADER.pack(rounds, playerScore, botScore, len(playerText),
+                                            len(botText), len(seedText), *points))
+        self.file.write(playerText + botText + seedText)
+        self.file.write(packed)
+
+    def writeMatch(self, match, player, bot, seed=None):
+        """ appends a finished engine match """
+        self.write(player, bot, match.player.score, match.bot.score,
+                   match.player.history, match.bot.history, seed, match.payoffs)
+
+    def writeResults(self, results, masterSeed=None, payoffs=PAYOFFS):
+        """ appends a list of scheduler results """
+        for result in results:
+            seed = None
+            if masterSeed is not None:
+                seed = "%s/%s/%s/%d" % (masterSeed, result.playerStrategy, result.botStrategy, result.repetition)
+            self.write(result.playerStrategy, result.botStrategy, result.playerScore, result.botScore,
+                       result.playerHistory, result.botHistory, seed, payoffs)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class MatchLog:
+
+    def __init__(self, path):
+        """ maps the log at path into memory for reading """
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = b""
+        if os.fstat(self.file.fileno()).st_size > 0:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < _FILE_HEADER.size:
+            raise ValueError("%s is not a match log" % path)
+        magic, version = _FILE_HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a match log" % path)
+        if version != VERSION:
+            raise ValueError("%s is match log version %d, not %d" % (path, version, VERSION))
+        self.offsets = None
+
+    def __iter__(self):
+        """ yields every match in the log in the order they were written """
+        offset = _FILE_HEADER.size
+        while offset < len(self.data):
+            logged = LoggedMatch(self.data, offset)
+            yield logged
+            offset = logged.end
+
+    def index(self):
+        """ returns the offset of every record, reading only their headers. The
+        offsets are kept for looking matches up by position """
+        if self.offsets is None:
+            self.offsets = []
+            offset = _FILE_HEADER.size
+            header = _RECORD_HEADER
+            while offset < len(self.data):
+                rounds, playerScore, botScore, playerLength, botLength, seedLength = \
+                    header.unpack_from(self.data, offset)[:6]
+                self.offsets.append(offset)
+                offset += header.size + playerLength + botLength + seedLength + ((rounds + 3) >> 2)
+        return self.offsets
+
+    def __len__(self):
+        return len(self.index())
+
+    def __getitem__(self, n):
+        """ returns the nth match in the log """
+        return LoggedMatch(self.data, self.index()[n])
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,60 @@
+# Noise
+# Implementation noise for matches: each move a side means to play has a
+# chance of coming out as the other move, one chance for an intended
+# cooperation turning into a defection and another for the reverse. The
+# move that comes out is the one recorded, so strategies react to what
+# was actually played.
+#
+# Rather than drawing a random number for every move, the rounds where
+# errors happen are drawn up front. The gap between one error and the
+# next follows a geometric distribution, so it can be drawn directly, and
+# a match with a small error rate only needs a few draws in all.
+
+from math import log
+
+def errorRates(noise):
+    """ turns noise, given as one chance for both moves or as a pair of chances
+    (cooperation played as a defection, defection played as a cooperation), into
+    that pair. None means no noise """
+    if noise is None:
+        return 0.0, 0.0
+    if isinstance(noise, (int, float)):
+        noise = (noise, noise)
+    cooperateError, defectError = noise
+    for rate in (cooperateError, defectError):
+        if not 0 <= rate <= 1:
+            raise ValueError("error rates must be between 0 and 1, not %r" % (rate,))
+    return float(cooperateError), float(defectError)
+
+def errorRounds(rounds, rate, rng):
+    """ returns the rounds, counted from 0, in which an error happens when each of
+    the given number of rounds has the given chance of one """
+    if rate <= 0:
+        return []
+    if rate >= 1:
+        return list(range(rounds))
+    chosen = []
+    scale = 1 / log(1 - rate)
+    round = -1
+    while True:
+        # 1 - random() lies in (0, 1], so the logarithm is always defined
+        round += 1 + int(log(1 - rng.random()) * scale)
+        if round >= rounds:
+            return chosen
+        chosen.append(round)
+
+# the bits of an error mask that flip an intended cooperation and an intended defection
+FLIP_COOPERATE = 1
+FLIP_DEFECT = 2
+
+def errorMask(rounds, noise, rng):
+    """ draws a mask of the given number of rounds for one side of a match. Each byte
+    has FLIP_COOPERATE set when a cooperation would be played as a defection that
+    round, and FLIP_DEFECT set when a defection would be played as a cooperation """
+    cooperateError, defectError = errorRates(noise)
+    mask = bytearray(rounds)
+    for round in errorRounds(rounds, cooperateError, rng):
+        mask[round] |= FLIP_COOPERATE
+    for round in errorRounds(rounds, defectError, rng):
+        mask[round] |= FLIP_DEFECT
+    return mask
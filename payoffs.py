@@ -0,0 +1,137 @@
+# Payoffs
+# The points each side earns for every pair of moves, kept as a payoff
+# matrix. A matrix is checked when it is made, so a missing or malformed
+# entry is reported straight away rather than partway through a match. It
+# also precomputes a flat table with one entry per pair of moves, indexed
+# by the pair's code (player move index * number of moves + bot move
+# index), which the array-based tournaments turn straight into lookups.
+#
+# The usual game is given by its temptation, reward, punishment and
+# sucker's payoffs (T, R, P and S). Matrices may also be asymmetric, or
+# have more moves than cooperate and defect, though the strategies and
+# the game only ever play 'C' and 'D'.
+
+class PayoffMatrix:
+
+    def __init__(self, points, moves="CD"):
+        """ makes a matrix from a dictionary of (player move, bot move): (player points,
+        bot points) covering every pair of the given moves, which are single letters """
+        if len(moves) < 2 or len(set(moves)) != len(moves):
+            raise ValueError("a payoff matrix needs at least two different moves, not %r" % (moves,))
+        for move in moves:
+            if not isinstance(move, str) or len(move) != 1:
+                raise ValueError("moves must be single letters, not %r" % (move,))
+        self.moves = "".join(moves)
+        self.index = {}
+        for move in self.moves:
+            self.index[move] = len(self.index)
+
+        # checks every entry, then fills the table in code order
+        for pair in points:
+            if len(pair) != 2 or pair[0] not in self.index or pair[1] not in self.index:
+                raise ValueError("payoff given for unknown moves %r" % (pair,))
+        self.points = {}
+        self.table = []
+        for playerMove in self.moves:
+            for botMove in self.moves:
+                if (playerMove, botMove) not in points:
+                    raise ValueError("no payoff given for %s%s" % (playerMove, botMove))
+                entry = tuple(points[(playerMove, botMove)])
+                if len(entry) != 2 or not all(isinstance(p, (int, float)) and not isinstance(p, bool)
+                                              for p in entry):
+                    raise ValueError("the payoff for %s%s must be two numbers, not %r"
+                                     % (playerMove, botMove, points[(playerMove, botMove)]))
+                self.points[(playerMove, botMove)] = entry
+                self.table.append(entry)
+
+    @classmethod
+    def fromTRPS(cls, T=3, R=2, P=1, S=0, check=True):
+        """ makes the symmetric two-move game with the given temptation, reward,
+        punishment and sucker's payoffs. Unless check is false, the payoffs must
+        make a dilemma, T > R > P > S, in which taking turns at defecting
+        (T + S) pays less than cooperating (2R) """
+        if check and not T > R > P > S:
+            raise ValueError("a prisoner's dilemma needs T > R > P > S, not T=%g R=%g P=%g S=%g" % (T, R, P, S))
+        if check and not 2 * R > T + S:
+            raise ValueError("a prisoner's dilemma needs 2R > T + S, not R=%g T+S=%g" % (R, T + S))
+        return cls({('C', 'C'): (R, R),
+                    ('C', 'D'): (S, T),
+                    ('D', 'C'): (T, S),
+                    ('D', 'D'): (P, P)})
+
+    @classmethod
+    def of(cls, payoffs):
+        """ returns payoffs as a matrix, making one from a dictionary when needed """
+        if isinstance(payoffs, cls):
+            return payoffs
+        moves = []
+        for pair in payoffs:
+            for move in pair:
+                if move not in moves:
+                    moves.append(move)
+        if "".join(sorted(moves)) == "CD":
+            moves = "CD"
+        return cls(payoffs, moves)
+
+    @classmethod
+    def fromText(cls, text):
+        """ reads a matrix written by text() """
+        points = {}
+        for entry in text.split():
+            pair, _, values = entry.partition("=")
+            if len(pair) != 2:
+                raise ValueError("cannot read the payoff %r" % entry)
+            numbers = []
+            for value in values.split(","):
+                number = float(value)
+                if number.is_integer() and "." not in value:
+                    number = int(number)
+                numbers.append(number)
+            points[(pair[0], pair[1])] = numbers
+        return cls.of(points)
+
+    def text(self):
+        """ writes the matrix as text, such as "CC=2,2 CD=0,3 DC=3,0 DD=1,1" """
+        return " ".join("%s%s=%s,%s" % (playerMove, botMove, points[0], points[1])
+                        for (playerMove, botMove), points in self.points.items())
+
+    def code(self, playerMove, botMove):
+        """ returns the position of a pair of moves in the table """
+        return self.index[playerMove] * len(self.moves) + self.index[botMove]
+
+    def isSymmetric(self):
+        """ returns whether swapping sides swaps the points """
+        for (playerMove, botMove), (playerPoints, botPoints) in self.points.items():
+            if self.points[(botMove, playerMove)] != (botPoints, playerPoints):
+                return False
+        return True
+
+    def isIntegral(self):
+        """ returns whether every payoff is a whole number """
+        return all(isinstance(p, int) for entry in self.table for p in entry)
+
+    def __getitem__(self, pair):
+        return self.points[pair]
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def items(self):
+        return self.points.items()
+
+    def __eq__(self, other):
+        if isinstance(other, PayoffMatrix):
+            return self.moves == other.moves and self.table == other.table
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.moves, tuple(self.table)))
+
+    def __repr__(self):
+        return "PayoffMatrix(%r)" % self.text()
+
+# the game as it has always been played: T=3, R=2, P=1, S=0
+PRISONERS_DILEMMA = PayoffMatrix.fromTRPS(T=3, R=2, P=1, S=0)
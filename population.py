@@ -0,0 +1,113 @@
+# Population
+# Evolves populations of agents playing the six AI strategies. How well a
+# strategy does against another only depends on the pair, so the mean
+# scores of every pairing are worked out once with the vectorized
+# tournament and cached as a payoff matrix. Each generation then only
+# needs that matrix and the strategy frequencies, kept as arrays, rather
+# than replaying matches.
+#
+# Two kinds of evolution are offered: replicator dynamics, where the share
+# of each strategy in an unlimited population grows with how far its
+# fitness is above the average, and the Moran process, where a finite
+# population of agents changes one birth and one death at a time. Many
+# independent populations can be evolved at once by giving a row of
+# frequencies or counts for each.
+
+import numpy as np
+
+from engine import PAYOFFS
+from noise import errorRates
+from payoffs import PayoffMatrix
+from tournament import STRATEGIES, roundRobin, scoreTable
+
+# payoff matrices already worked out, keyed by the arguments that made them
+_matrices = {}
+
+def payoffMatrix(names=None, runs=10, repetitions=1000, payoffs=PAYOFFS, seed=0, window=6, noise=None):
+    """ returns the matrix whose entry [i, j] is the mean score strategy i earns in a
+    match of the given number of runs against strategy j, averaged over the given
+    number of repetitions, with moves flipped by noise as in noise.py. Matrices
+    are cached, so asking again with the same arguments does not replay the
+    tournament. The matrix is read-only """
+    if names is None:
+        names = list(STRATEGIES)
+    payoffs = PayoffMatrix.of(payoffs)
+    key = (tuple(names), runs, repetitions, payoffs, seed, window, errorRates(noise))
+    if key not in _matrices:
+        results = roundRobin(runs, repetitions, names, payoffs, seed, window, noise)
+        matrix = scoreTable(results, names)
+        matrix.flags.writeable = False
+        _matrices[key] = matrix
+    return _matrices[key]
+
+def replicator(matrix, frequencies, generations, baseline=0.0):
+    """ runs discrete replicator dynamics for the given number of generations,
+    returning the frequencies after every generation, starting with the initial
+    ones. Each generation a strategy's share is scaled by its fitness (baseline
+    plus its mean score against the population) over the population's mean
+    fitness. frequencies may hold one population or a row for each of several """
+    frequencies = np.asarray(frequencies, dtype=float)
+    single = frequencies.ndim == 1
+    x = np.atleast_2d(frequencies)
+    x = x / x.sum(axis=1, keepdims=True)
+    shifted = matrix + baseline
+    if (shifted < 0).any():
+        raise ValueError("fitness must not be negative; raise the baseline")
+
+    history = np.zeros((generations + 1,) + x.shape)
+    history[0] = x
+    for generation in range(1, generations + 1):
+        fitness = x @ shifted.T
+        mean = (x * fitness).sum(axis=1, keepdims=True)
+        x = x * fitness / mean
+        history[generation] = x
+    if single:
+        return history[:, 0]
+    return history
+
+def moran(matrix, counts, steps, intensity=1.0, rng=None, every=0):
+    """ runs the Moran process for the given number of steps. In each step one agent,
+    picked with chance in proportion to its fitness, has an offspring using its
+    strategy, which replaces an agent picked at random. An agent's fitness is
+    1 - intensity + intensity * its mean score against the other agents. counts
+    holds how many agents use each strategy, for one population or as a row for
+    each of several, which all take their steps together. Returns the final
+    counts, along with the counts after every `every` steps when every is set """
+    if rng is None:
+        rng = np.random.default_rng()
+    counts = np.array(counts, dtype=np.int64)
+    single = counts.ndim == 1
+    counts = np.atleast_2d(counts)
+    populations = np.arange(len(counts))
+    size = counts.sum(axis=1)
+    if (size < 2).any():
+        raise ValueError("every population needs at least two agents")
+    if (1 - intensity + intensity * matrix < 0).any():
+        raise ValueError("fitness must not be negative; lower the intensity")
+    diagonal = np.diag(matrix)
+    others = (size - 1)[:, None].astype(float)
+
+    recorded = []
+    for step in range(steps):
+        # an agent's mean score is over every other agent, so it leaves itself out
+        scores = (counts @ matrix.T - diagonal) / others
+        births = counts * (1 - intensity + intensity * scores)
+        birth = _pick(births, rng)
+        death = _pick(counts, rng)
+        counts[populations, birth] += 1
+        counts[populations, death] -= 1
+        if every and (step + 1) % every == 0:
+            recorded.append(counts.copy())
+
+    if single:
+        counts = counts[0]
+        recorded = [row[0] for row in recorded]
+    if every:
+        return counts, np.array(recorded)
+    return counts
+
+def _pick(weights, rng):
+    # picks a strategy for each population with chance in proportion to its weight
+    totals = np.cumsum(weights, axis=1)
+    targets = rng.random(len(weights)) * totals[:, -1]
+    return np.minimum((totals <= targets[:, None]).sum(axis=1), weights.shape[1] - 1)
@@ -0,0 +1,102 @@
+# Profiling
+# Optional timing for the game loop. A Profiler times named phases, such
+# as waiting for the player's click, the bot's strategy, scoring and
+# drawing, and counts events such as the graphics module's window updates
+# and canvas item creates and deletes. The most recent timings of each
+# phase are kept in ring buffers, so a long session uses a fixed amount of
+# memory, and can be summarized as percentiles or written out as a Chrome
+# trace (chrome://tracing or ui.perfetto.dev) to see where each turn's
+# time goes.
+
+import json
+import math
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from ringbuffer import RingBuffer
+
+# the percentiles shown in summaries
+PERCENTILES = [50, 90, 99]
+
+def percentile(values, p):
+    """ returns the pth percentile of the values, taking the nearest rank """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+class Profiler:
+
+    def __init__(self, capacity=10000):
+        """ keeps the last capacity timings of each phase, and the last capacity
+        trace events overall """
+        self.capacity = capacity
+        self.durations = {}
+        self.events = deque(maxlen=capacity)
+        self.counters = {}
+        self.origin = time.perf_counter_ns()
+
+    @contextmanager
+    def phase(self, name):
+        """ times the with block as one run of the named phase """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self.record(name, start, end)
+
+    def record(self, name, start, end):
+        """ records a run of the named phase between two perf_counter_ns readings """
+        if name not in self.durations:
+            self.durations[name] = RingBuffer(self.capacity)
+        self.durations[name].append((end - start) / 1e9)
+        self.events.append((name, start, end))
+
+    def count(self, name, n=1):
+        """ adds n to the named counter """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """ returns, for each phase, how many runs are kept along with their mean,
+        percentiles and longest time in seconds """
+        summary = {}
+        for name, durations in self.durations.items():
+            values = list(durations)
+            stats = {"count": len(values), "mean": sum(values) / len(values), "max": max(values)}
+            for p in PERCENTILES:
+                stats["p%d" % p] = percentile(values, p)
+            summary[name] = stats
+        return summary
+
+    def report(self):
+        """ returns the summary and counters as lines of text """
+        lines = []
+        for name, stats in self.summary().items():
+            lines.append("%-10s %6d runs  mean %8.2f ms  " % (name, stats["count"], stats["mean"] * 1e3) +
+                         "  ".join("p%d %8.2f ms" % (p, stats["p%d" % p] * 1e3) for p in PERCENTILES) +
+                         "  max %8.2f ms" % (stats["max"] * 1e3))
+        for name in sorted(self.counters):
+            lines.append("%-10s %6d" % (name, self.counters[name]))
+        return "\n".join(lines)
+
+    def trace(self):
+        """ returns the kept events and the counters in the Chrome trace event format """
+        pid = os.getpid()
+        events = []
+        for name, start, end in self.events:
+            events.append({"name": name, "ph": "X", "pid": pid, "tid": 0,
+                           "ts": (start - self.origin) / 1e3, "dur": (end - start) / 1e3})
+        now = (time.perf_counter_ns() - self.origin) / 1e3
+        for name, value in self.counters.items():
+            events.append({"name": name, "ph": "C", "pid": pid, "tid": 0, "ts": now,
+                           "args": {name: value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def writeTrace(self, path):
+        """ writes the trace to a JSON file """
+        with open(path, "w") as file:
+            json.dump(self.trace(), file)
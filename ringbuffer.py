@@ -0,0 +1,41 @@
+# Ring Buffer
+# A fixed-size window over the most recent values added to it. The values
+# live in a preallocated list that is overwritten in a circle, and a
+# running total is kept as values enter and leave the window, so adding a
+# value and asking for the window's average both take constant time
+# however wide the window is.
+
+class RingBuffer:
+
+    def __init__(self, size):
+        """ creates an empty window holding at most size values """
+        if size < 1:
+            raise ValueError("ring buffer size must be at least 1")
+        self.size = size
+        self.values = [0] * size
+        self.start = 0
+        self.count = 0
+        self.total = 0
+
+    def append(self, value):
+        """ adds a value to the window, pushing out the oldest one when it is full """
+        if self.count < self.size:
+            self.values[(self.start + self.count) % self.size] = value
+            self.count += 1
+        else:
+            self.total -= self.values[self.start]
+            self.values[self.start] = value
+            self.start = (self.start + 1) % self.size
+        self.total += value
+
+    def average(self):
+        """ returns the total of the window divided by its size, so a window that
+        is not full yet counts its empty places as zero """
+        return self.total / self.size
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.values[(self.start + i) % self.size]
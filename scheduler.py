@@ -0,0 +1,111 @@
+# Scheduler
+# Runs a round-robin tournament of the AI strategies across a pool of
+# worker processes. Every match gets its own random number generator,
+# seeded from the tournament's master seed and the match's place in the
+# tournament, so the results are the same no matter how many workers
+# play them or in what order they finish. Results are handed back as
+# each shard of matches finishes, so a long tournament can report its
+# progress and be stopped early without losing the matches already played.
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from random import Random
+
+from engine import PAYOFFS, playMatch
+import strategies
+
+class MatchResult:
+
+    def __init__(self, playerStrategy, botStrategy, repetition, match):
+        """ holds the outcome of a single tournament match """
+        self.playerStrategy = playerStrategy
+        self.botStrategy = botStrategy
+        self.repetition = repetition
+        self.runs = match.runs
+        self.playerScore = match.player.score
+        self.botScore = match.bot.score
+        self.playerHistory = match.player.history.moves()
+        self.botHistory = match.bot.history.moves()
+
+def matchRng(masterSeed, playerStrategy, botStrategy, repetition):
+    """ creates the random number generator for one match. Seeding from a string
+    does not depend on the process's hash seed, so every worker derives the
+    same generator for the same match """
+    return Random("%s/%s/%s/%d" % (masterSeed, playerStrategy, botStrategy, repetition))
+
+def playShard(shard):
+    """ plays a run of repetitions of one pairing, returning their results. This
+    is what each worker process runs, so the strategies are passed by their
+    registered names """
+    playerStrategy, botStrategy, first, count, runs, payoffs, masterSeed, window, noise = shard
+    results = []
+    for repetition in range(first, first + count):
+        rng = matchRng(masterSeed, playerStrategy, botStrategy, repetition)
+
+        # like the game, picks the number of runs at random when none is given
+        matchRuns = runs
+        if matchRuns is None:
+            matchRuns = rng.randint(6, 20)
+        match = playMatch(playerStrategy, botStrategy, matchRuns, payoffs, rng, window, noise=noise)
+        results.append(MatchResult(playerStrategy, botStrategy, repetition, match))
+    return results
+
+def makeShards(names, repetitions, runs, payoffs, masterSeed, shardSize, window=6, noise=None):
+    """ splits every pairing of the strategies, including self-play, into
+    shards of at most shardSize repetitions """
+    shards = []
+    for i in range(len(names)):
+        for j in range(i, len(names)):
+            for first in range(0, repetitions, shardSize):
+                count = min(shardSize, repetitions - first)
+                shards.append((names[i], names[j], first, count, runs, payoffs, masterSeed, window, noise))
+    return shards
+
+def runTournament(repetitions, runs=None, masterSeed=0, names=None, payoffs=PAYOFFS,
+                  workers=None, shardSize=1000, window=6, noise=None):
+    """ plays a round-robin tournament, yielding the list of results for each
+    shard as soon as it finishes. Shards finish in any order, but each match's
+    result only depends on the master seed. Closing the generator early cancels
+    the shards that have not started yet. With one worker the shards are played
+    in this process. window sets how many recent scores the adaptive strategy averages,
+    and noise makes moves sometimes come out as the other move, as in noise.py """
+    if names is None:
+        names = strategies.names()
+    shards = makeShards(names, repetitions, runs, payoffs, masterSeed, shardSize, window, noise)
+
+    if workers == 1:
+        for shard in shards:
+            yield playShard(shard)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = set(pool.submit(playShard, shard) for shard in shards)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def totalScores(results):
+    """ adds up the scores every strategy earned against every other strategy,
+    returning them keyed by (strategy, opponent) along with the match counts """
+    totals = {}
+    counts = {}
+    for result in results:
+        for key, score in (((result.playerStrategy, result.botStrategy), result.playerScore),
+                           ((result.botStrategy, result.playerStrategy), result.botScore)):
+            totals[key] = totals.get(key, 0) + score
+            counts[key] = counts.get(key, 0) + 1
+    return totals, counts
+
+if __name__ == '__main__':
+    # plays a small tournament, printing progress as the shards come back
+    played = []
+    total = 21 * 200
+    for shard in runTournament(200, masterSeed=1, shardSize=50):
+        played.extend(shard)
+        print("played %d of %d matches" % (len(played), total))
+    totals, counts = totalScores(played)
+    for key in sorted(totals):
+        print(key, totals[key] / counts[key])
@@ -0,0 +1,134 @@
+# Score Store
+# Keeps the result of every match in an SQLite database: who played,
+# the seed, the number of rounds, both scores and both move histories.
+# Results are gathered into batches and written in a single transaction,
+# and the database runs in write-ahead-log mode so that several processes
+# can write results while others read the career statistics. The
+# statistics come from aggregate queries over an index rather than from
+# rereading a file.
+
+import sqlite3
+import time
+
+from engine import PAYOFFS
+from history import History
+from payoffs import PayoffMatrix
+
+# the name recorded for the human side of a match played through the game
+HUMAN = "human"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    bot TEXT NOT NULL,
+    seed TEXT,
+    rounds INTEGER NOT NULL,
+    playerScore INTEGER NOT NULL,
+    botScore INTEGER NOT NULL,
+    playerHistory BLOB NOT NULL,
+    botHistory BLOB NOT NULL,
+    payoffs TEXT NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matchesByPlayer ON matches (player, bot, playerScore, botScore);
+"""
+
+def payoffText(payoffs):
+    """ writes a payoff matrix or dictionary as text, such as "CC=2,2 CD=0,3 DC=3,0 DD=1,1",
+    which PayoffMatrix.fromText reads back """
+    return PayoffMatrix.of(payoffs).text()
+
+class ScoreStore:
+
+    def __init__(self, path="scores.db", batchSize=1000):
+        """ opens (or creates) the database at path. Results are written once
+        batchSize of them have been recorded, or when flush is called """
+        self.path = path
+        self.batchSize = batchSize
+        self.pending = []
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def record(self, player, bot, playerScore, botScore, playerHistory, botHistory,
+               seed=None, payoffs=PAYOFFS):
+        """ adds the result of a match to the current batch. The histories may be
+        History objects or strings of moves """
+        if not isinstance(playerHistory, History):
+            playerHistory = History(playerHistory)
+        if not isinstance(botHistory, History):
+            botHistory = History(botHistory)
+        if seed is not None:
+            seed = str(seed)
+        self.pending.append((player, bot, seed, len(playerHistory), playerScore, botScore,
+                             bytes(playerHistory.bits), bytes(botHistory.bits),
+                             payoffText(payoffs), time.time()))
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+
+    def recordMatch(self, match, player, bot, seed=None):
+        """ adds a finished engine match to the current batch """
+        self.record(player, bot, match.player.score, match.bot.score,
+                    match.player.history, match.bot.history, seed, match.payoffs)
+
+    def recordResults(self, results, masterSeed=None, payoffs=PAYOFFS):
+        """ adds a list of scheduler results to the current batch """
+        for result in results:
+            seed = None
+            if masterSeed is not None:
+                seed = "%s/%s/%s/%d" % (masterSeed, result.playerStrategy, result.botStrategy, result.repetition)
+            self.record(result.playerStrategy, result.botStrategy, result.playerScore, result.botScore,
+                        result.playerHistory, result.botHistory, seed, payoffs)
+
+    def flush(self):
+        """ writes every pending result in a single transaction """
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany("INSERT INTO matches (player, bot, seed, rounds, playerScore, "
+                                        "botScore, playerHistory, botHistory, payoffs, recorded) "
+                                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+
+    def careerStats(self, player=HUMAN):
+        """ returns the wins, losses and ties the player has against each opponent,
+        as opponent: (wins, losses, ties) """
+        self.flush()
+        rows = self.connection.execute("SELECT bot, "
+                                       "SUM(playerScore > botScore), "
+                                       "SUM(playerScore < botScore), "
+                                       "SUM(playerScore = botScore) "
+                                       "FROM matches WHERE player = ? GROUP BY bot", (player,))
+        stats = {}
+        for bot, wins, losses, ties in rows:
+            stats[bot] = (wins, losses, ties)
+        return stats
+
+    def histories(self, matchId):
+        """ returns the player's and bot's move histories for a recorded match """
+        row = self.connection.execute("SELECT rounds, playerHistory, botHistory FROM matches "
+                                      "WHERE id = ?", (matchId,)).fetchone()
+        if row is None:
+            raise KeyError("no match with id %r" % matchId)
+        rounds, playerBits, botBits = row
+        return History.fromBits(playerBits, rounds), History.fromBits(botBits, rounds)
+
+    def payoffs(self, matchId):
+        """ returns the payoff matrix a recorded match was played with """
+        row = self.connection.execute("SELECT payoffs FROM matches WHERE id = ?", (matchId,)).fetchone()
+        if row is None:
+            raise KeyError("no match with id %r" % matchId)
+        return PayoffMatrix.fromText(row[0])
+
+    def close(self):
+        """ writes any pending results and closes the database """
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
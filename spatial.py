@@ -0,0 +1,129 @@
+# Spatial
+# Plays the Prisoner's Dilemma on a lattice. Every cell of a grid that
+# wraps around at its edges (a torus) holds an agent using one of the AI
+# strategies. Each step every agent plays a match against each of its
+# neighbors, scoring the mean points its strategy earns against theirs
+# from the cached payoff matrix in population.py, and then takes up the
+# strategy of whichever neighbor scored best, keeping its own unless a
+# neighbor did strictly better.
+#
+# The whole grid is updated with array operations: each neighbor is a
+# shifted view of a copy of the grid padded by its wrapped-around edges,
+# so there are no loops over cells. Very large grids can be split into
+# strips of rows that worker processes step side by side.
+
+import numpy as np
+
+from population import payoffMatrix
+from tournament import STRATEGIES
+
+# the offsets (rows, columns) of the neighbors each agent plays
+MOORE = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+VON_NEUMANN = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+
+# the color each strategy is drawn in, matching its button on the selection screen
+PALETTE = np.array([[110, 139, 61],    # DarkOliveGreen4
+                    [255, 140, 0],     # dark orange
+                    [238, 201, 0],     # gold2
+                    [139, 35, 35],     # brown4
+                    [141, 238, 238],   # DarkSlateGray2
+                    [238, 180, 180]],  # RosyBrown2
+                   dtype=np.uint8)
+
+# scores are compared as whole numbers of this fraction of a point, with the
+# strategy packed into the bits below them
+_SCALE = 1 << 20
+_STRATEGY_BITS = 5
+_SELF = 16
+
+class Lattice:
+
+    def __init__(self, width, height, names=None, matrix=None, neighbors=MOORE, seed=None):
+        """ fills a width by height torus with agents whose strategies are picked at
+        random from names. matrix[i, j] is the score strategy i earns against strategy
+        j, worked out by population.payoffMatrix when it is not given """
+        if names is None:
+            names = list(STRATEGIES)
+        if len(names) > _SELF:
+            raise ValueError("a lattice can hold at most %d strategies" % _SELF)
+        self.names = names
+        if matrix is None:
+            matrix = payoffMatrix(names)
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.neighbors = neighbors
+        self.rng = np.random.default_rng(seed)
+        self.grid = self.rng.integers(0, len(names), size=(height, width)).astype(np.int8)
+        self.generation = 0
+
+    def scores(self):
+        """ returns the total score every agent earns against its neighbors """
+        return _scores(self.grid, self.matrix, self.neighbors)
+
+    def step(self):
+        """ plays one step: every agent plays its neighbors, then takes up the
+        strategy of the best scoring one """
+        self.grid = _step(self.grid, self.matrix, self.neighbors)
+        self.generation += 1
+        return self
+
+    def stepTiled(self, pool, tiles):
+        """ plays one step with the grid split into the given number of strips of rows,
+        each stepped by the pool, a concurrent.futures executor. Each strip is sent
+        with the two rows on either side of it that its agents' neighbors depend on """
+        height = len(self.grid)
+        bounds = np.linspace(0, height, tiles + 1).astype(int)
+        jobs = []
+        for n in range(tiles):
+            rows = np.arange(bounds[n] - 2, bounds[n + 1] + 2)
+            strip = np.take(self.grid, rows, axis=0, mode="wrap")
+            jobs.append((strip, self.matrix, self.neighbors))
+        self.grid = np.concatenate(list(pool.map(_stepStrip, jobs)))
+        self.generation += 1
+        return self
+
+    def counts(self):
+        """ returns how many agents use each strategy """
+        return np.bincount(self.grid.ravel(), minlength=len(self.names))
+
+    def colors(self):
+        """ returns the grid as a (height, width, 3) array of the strategies' colors """
+        return PALETTE[self.grid % len(PALETTE)]
+
+    def render(self, image, x=0, y=0):
+        """ draws the grid into a graphics.Image, one pixel per agent, with its top
+        left corner at pixel (x,y) """
+        height, width = self.grid.shape
+        image.setPixels(x, y, width, height, self.colors())
+
+def _scores(grid, matrix, neighbors):
+    # adds up each agent's points against every neighbor through the flattened
+    # matrix, indexed by the agent's strategy * strategies + the neighbor's
+    height, width = grid.shape
+    strategies = len(matrix)
+    table = matrix.ravel()
+    padded = np.pad(grid, 1, mode="wrap")
+    base = grid.astype(np.intp) * strategies
+    scores = np.zeros(grid.shape)
+    for dy, dx in neighbors:
+        scores += table.take(base + padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width])
+    return scores
+
+def _step(grid, matrix, neighbors):
+    # packs each agent's score and strategy into one key so that a running maximum
+    # over the neighbors finds the best scorer. Each agent's own key also has the
+    # _SELF bit set, so it keeps its strategy when a neighbor only ties it
+    height, width = grid.shape
+    keys = np.rint(_scores(grid, matrix, neighbors) * _SCALE).astype(np.int64)
+    keys = (keys << _STRATEGY_BITS) | grid
+    padded = np.pad(keys, 1, mode="wrap")
+    best = keys | _SELF
+    for dy, dx in neighbors:
+        np.maximum(best, padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width], out=best)
+    return (best & (_SELF - 1)).astype(np.int8)
+
+def _stepStrip(job):
+    # steps a strip with two rows either side of it, returning only the strip's own
+    # rows. The outer rows wrap around to the wrong side of the strip, which only
+    # spoils the scores of the rows the strip does not return
+    strip, matrix, neighbors = job
+    return _step(strip, matrix, neighbors)[2:-2]
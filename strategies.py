@@ -0,0 +1,178 @@
+# Strategies
+# The six AI strategies of the Prisoner's Dilemma game, written so that
+# they can be played by either side of a match. Each strategy is handed
+# its own side and the opposing side and returns its move as 'C' or 'D'.
+# None of these functions touch the graphics module, so they can be
+# used on machines without a display.
+#
+# Strategies are kept in a registry by name. Other strategies can be added
+# without editing the game by registering them in a module that is loaded
+# with loadModule, or by publishing them under the entry point group named
+# by ENTRY_POINT_GROUP.
+
+import importlib
+import inspect
+from importlib import metadata
+
+ENTRY_POINT_GROUP = "prisonersdilemma.strategies"
+
+# registered strategies, in the order they were registered, as name: (strategy, label)
+_registry = {}
+
+class Strategy:
+
+    """ base class for strategies that keep their own state between rounds. A new
+    instance is made for every match, and the match calls its move method with
+    the strategy's side and the opposing side, expecting 'C' or 'D' back """
+
+    def move(self, me, opponent):
+        raise NotImplementedError("strategies must override move()")
+
+def register(name=None, label=None):
+    """ returns a decorator that adds a strategy to the registry. The strategy may
+    be a function taking (me, opponent) or a subclass of Strategy. The name
+    defaults to the function or class name, and the label, shown on the game's
+    selection screen, defaults to the name """
+    def decorator(strategy):
+        strategyName = name or strategy.__name__
+        if strategyName in _registry:
+            raise ValueError("a strategy named %r is already registered" % strategyName)
+        _registry[strategyName] = (strategy, label or strategyName)
+        return strategy
+    return decorator
+
+def names():
+    """ returns the names of the registered strategies in the order they were registered """
+    return list(_registry)
+
+def label(name):
+    """ returns the label shown for the named strategy on the selection screen """
+    return _registry[name][1]
+
+def resolve(strategy):
+    """ turns a strategy name, Strategy subclass or function into the callable that
+    plays one match. This is done once when a match is set up, so that each round
+    calls the strategy directly. Strategy subclasses get a new instance each time """
+    if isinstance(strategy, str):
+        if strategy not in _registry:
+            raise KeyError("no strategy named %r is registered" % strategy)
+        strategy = _registry[strategy][0]
+    if inspect.isclass(strategy):
+        return strategy().move
+    return strategy
+
+def loadModule(moduleName):
+    """ imports a module so that the strategies it registers become available """
+    return importlib.import_module(moduleName)
+
+def loadEntryPoints(group=ENTRY_POINT_GROUP):
+    """ registers the strategies installed under the entry point group, using each
+    entry point's name as the strategy name. Returns the names that were added """
+    added = []
+    for entryPoint in metadata.entry_points(group=group):
+        if entryPoint.name in _registry:
+            continue
+        register(entryPoint.name)(entryPoint.load())
+        added.append(entryPoint.name)
+    return added
+
+@register(label="Random Strategy")
+def randMove(me, opponent):
+    """ represents the random AI strategy, using the side's random number
+    generator to randomly choose between cooperating or defecting """
+    move = me.rng.choice([1,2])
+    if move == 1:
+        return 'D'
+    return 'C'
+
+@register(label="Tit-for-Tat Strategy")
+def titForTat(me, opponent):
+    """ represents an AI strategy that simply mimics the move the opponent made
+    in the previous round """
+    rounds = len(me.history)
+
+    # this handles the edge case at the start of the game where there is no previous
+    # round, copying the opponent's first move if they have already made it
+    if rounds == 0:
+        if len(opponent.history) == 0:
+            return 'C'
+        return opponent.history[0]
+    return opponent.history[rounds - 1]
+
+@register(label="Random Tit-for-Tat Strategy")
+def randomTitForTat(me, opponent):
+    """ creates another AI strategy that, depending on a randomly determined
+    interval at the start of the game, either mimics the opponent's last move or
+    chooses a random move """
+    if me.randCount % me.randMoves == 0:
+        move = randMove(me, opponent)
+    else:
+        move = titForTat(me, opponent)
+
+    # updates the interval after each turn so that the AI will switch
+    # between a random or mimicked move
+    me.randCount += 1
+    return move
+
+@register(label="Grudge Strategy")
+def grudges(me, opponent):
+    """ represents the AI strategy of a grudge, where the AI cooperates until defected on,
+    and then precedes to defect """
+    if len(opponent.history) > 0 and opponent.history[-1] == 'D':
+        me.grudge = True
+    if me.grudge:
+        return 'D'
+    return 'C'
+
+@register(label="PeaceMaker Strategy")
+def peaceMaker(me, opponent):
+    """ represents the peacemaker AI strategy that plays randomly until defected
+    on twice, then defects, and then mimics the opponent's moves, but will occasionally
+    cooperate instead of defecting """
+
+    # the opponent's history keeps a running count of their defections as moves
+    # are recorded, so this does not need to look back through every round
+    defectCount = opponent.history.defects
+
+    # defects if the opponent has defected twice
+    if defectCount == 2:
+        return 'D'
+
+    # if the opponent has defected more than twice, the AI either cooperates or
+    # mimics the opponent's last move
+    elif defectCount > 2:
+        stratMove = me.rng.choice([1,2])
+        if stratMove == 1:
+            return 'C'
+        return titForTat(me, opponent)
+
+    # the AI plays randomly until the opponent has defected twice
+    return randMove(me, opponent)
+
+@register(label="Adaptive Strategy")
+def adaptive(me, opponent):
+    """ functions as an adaptive AI strategy that uses the average score
+    from the past few moves (six unless the match sets another window), and after
+    registering which one is higher, uses that as their move to have the best
+    shot at winning """
+
+    # reads the running averages of both cooperations and defections over the window,
+    # which are kept up to date as each round is scored
+    cAvg = me.cAvg.average()
+    dAvg = me.dAvg.average()
+    round = len(me.history) + 1
+
+    # defects for the first three rounds of the game, cooperating the next 3
+    if 1 <= round <= 3:
+        return 'D'
+    elif 4 <= round <= 6:
+        return 'C'
+
+    # then precedes to calculate the average score benefits of both cooperating and
+    # defecting over the window, using that to play the better move
+    elif cAvg > dAvg:
+        return 'C'
+    return 'D'
+
+# the built-in strategies, in the order they are offered on the selection screen
+STRATEGIES = [randMove, titForTat, randomTitForTat, grudges, peaceMaker, adaptive]
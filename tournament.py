@@ -0,0 +1,217 @@
+# Tournament
+# Plays a round-robin tournament between the six AI strategies using NumPy.
+# Rather than playing one match at a time, every repetition of a pairing
+# is played at once: the move histories of all the matches live in arrays
+# of shape (matches, rounds) and each round is decided for every match with
+# array operations. The strategies follow the same rules as strategies.py,
+# with the second side moving after it has seen the first side's move.
+
+import numpy as np
+
+from engine import PAYOFFS
+from noise import errorRates
+from payoffs import PayoffMatrix
+
+# moves are stored as small integers in the history arrays
+COOPERATE = 0
+DEFECT = 1
+
+def payoffTable(payoffs=PAYOFFS):
+    """ turns a payoff matrix or dictionary into an array indexed by [player move,
+    bot move], holding the points for the player and the bot. The array holds
+    whole numbers unless some payoff is a fraction """
+    payoffs = PayoffMatrix.of(payoffs)
+    if payoffs.moves != "CD":
+        raise ValueError("only cooperate and defect can be played, not the moves %r" % payoffs.moves)
+    dtype = np.int64
+    if not payoffs.isIntegral():
+        dtype = np.float64
+    return np.array(payoffs.table, dtype=dtype).reshape(2, 2, 2)
+
+class VectorSide:
+
+    def __init__(self, strategy, matches, runs, rng, window=6, dtype=np.int64, noise=None):
+        """ holds one side of every match in a batch: the move histories as a
+        (matches, rounds) array, the scores, and the state kept by the strategies.
+        Scores are kept in dtype, which follows the payoff table. noise gives the
+        chances of a move coming out as the other one, as described in noise.py """
+        self.strategy = strategy
+        self.moves = np.zeros((matches, runs), dtype=np.int8)
+        self.filled = 0
+        self.score = np.zeros(matches, dtype=dtype)
+        self.defects = np.zeros(matches, dtype=np.int64)
+        self.grudge = np.zeros(matches, dtype=bool)
+        self.randMoves = rng.integers(1, runs + 1, size=matches)
+
+        # the last window scores stored under each opponent move for the adaptive
+        # strategy, kept as rings along with their running sums. Only the adaptive
+        # strategy reads them, so other strategies skip the bookkeeping
+        self.keepsAverages = strategy == "adaptive"
+        self.window = window
+        self.cAvg = np.zeros((matches, window), dtype=dtype)
+        self.dAvg = np.zeros((matches, window), dtype=dtype)
+        self.cCount = np.zeros(matches, dtype=np.int64)
+        self.dCount = np.zeros(matches, dtype=np.int64)
+        self.cSum = np.zeros(matches, dtype=dtype)
+        self.dSum = np.zeros(matches, dtype=dtype)
+
+        # the errors for every match and round are drawn at once, as masks of the
+        # moves that flip when cooperating and when defecting, or a single mask when
+        # both chances are the same. Without noise nothing is drawn, so the results
+        # are the same as they have always been
+        self.flips = None
+        cooperateError, defectError = errorRates(noise)
+        if cooperateError == defectError and cooperateError:
+            self.flips = self._errors(matches, runs, cooperateError, rng)
+        elif cooperateError or defectError:
+            self.flips = (self._errors(matches, runs, cooperateError, rng),
+                          self._errors(matches, runs, defectError, rng))
+
+    def _errors(self, matches, runs, rate, rng):
+        if not rate:
+            return np.zeros((matches, runs), dtype=np.int8)
+        return (rng.random((matches, runs)) < rate).astype(np.int8)
+
+    def record(self, moves):
+        """ stores this round's moves for every match, flipping the ones that come
+        out wrong when there is noise """
+        if isinstance(self.flips, tuple):
+            cooperateFlips, defectFlips = self.flips
+            moves = moves ^ np.where(moves == COOPERATE, cooperateFlips[:, self.filled],
+                                     defectFlips[:, self.filled])
+        elif self.flips is not None:
+            moves = moves ^ self.flips[:, self.filled]
+        self.moves[:, self.filled] = moves
+        self.defects += moves
+        self.filled += 1
+
+    def implementAdaptive(self, opponentMoves):
+        """ stores every match's score in the rolling averages used by the adaptive
+        strategy, under the move the opponent just made """
+        if not self.keepsAverages:
+            return
+        rows = np.arange(len(self.score))
+        for avg, count, total, move in ((self.cAvg, self.cCount, self.cSum, COOPERATE),
+                                        (self.dAvg, self.dCount, self.dSum, DEFECT)):
+            chosen = rows[opponentMoves == move]
+            slot = count[chosen] % self.window
+            total[chosen] += self.score[chosen] - avg[chosen, slot]
+            avg[chosen, slot] = self.score[chosen]
+            count[chosen] += 1
+
+def randMove(me, opponent, round, rng):
+    """ cooperates or defects at random in every match """
+    return (rng.random(len(me.score)) < 0.5).astype(np.int8)
+
+def titForTat(me, opponent, round, rng):
+    """ copies the opponent's move from the previous round, or their first move
+    when they have already made it in the first round """
+    if round == 0:
+        if opponent.filled == 0:
+            return np.zeros(len(me.score), dtype=np.int8)
+        return opponent.moves[:, 0].copy()
+    return opponent.moves[:, round - 1].copy()
+
+def randomTitForTat(me, opponent, round, rng):
+    """ plays tit-for-tat, except on the rounds picked by each match's random
+    interval, where it plays randomly """
+    random = (round + 1) % me.randMoves == 0
+    return np.where(random, randMove(me, opponent, round, rng), titForTat(me, opponent, round, rng))
+
+def grudges(me, opponent, round, rng):
+    """ cooperates until the opponent defects, then defects for the rest of the match """
+    if opponent.filled > 0:
+        me.grudge |= opponent.moves[:, opponent.filled - 1] == DEFECT
+    return me.grudge.astype(np.int8)
+
+def peaceMaker(me, opponent, round, rng):
+    """ plays randomly until defected on twice, then defects, and afterwards either
+    cooperates or plays tit-for-tat """
+    coin = rng.random(len(me.score)) < 0.5
+    forgiving = np.where(coin, COOPERATE, titForTat(me, opponent, round, rng))
+    moves = randMove(me, opponent, round, rng)
+    moves = np.where(opponent.defects == 2, DEFECT, moves)
+    moves = np.where(opponent.defects > 2, forgiving, moves)
+    return moves.astype(np.int8)
+
+def adaptive(me, opponent, round, rng):
+    """ defects for three rounds and cooperates for three, then plays whichever move
+    has the higher rolling average score """
+    if round < 3:
+        return np.full(len(me.score), DEFECT, dtype=np.int8)
+    elif round < 6:
+        return np.full(len(me.score), COOPERATE, dtype=np.int8)
+    return np.where(me.cSum > me.dSum, COOPERATE, DEFECT).astype(np.int8)
+
+# the vectorized strategies, under the names of the strategies they follow
+STRATEGIES = {"randMove": randMove,
+              "titForTat": titForTat,
+              "randomTitForTat": randomTitForTat,
+              "grudges": grudges,
+              "peaceMaker": peaceMaker,
+              "adaptive": adaptive}
+
+class PairingResult:
+
+    def __init__(self, playerStrategy, botStrategy, player, bot):
+        """ holds the histories and scores of every repetition of one pairing """
+        self.playerStrategy = playerStrategy
+        self.botStrategy = botStrategy
+        self.playerHistory = player.moves
+        self.botHistory = bot.moves
+        self.playerScores = player.score
+        self.botScores = bot.score
+
+def playPairing(playerStrategy, botStrategy, runs, repetitions, payoffs=PAYOFFS, rng=None, window=6,
+                noise=None):
+    """ plays every repetition of a pairing at once, one round at a time, looking
+    the points for all of the matches up in the payoff table """
+    if rng is None:
+        rng = np.random.default_rng()
+    table = payoffTable(payoffs)
+    playerMove = STRATEGIES[playerStrategy]
+    botMove = STRATEGIES[botStrategy]
+    player = VectorSide(playerStrategy, repetitions, runs, rng, window, table.dtype, noise)
+    bot = VectorSide(botStrategy, repetitions, runs, rng, window, table.dtype, noise)
+
+    for round in range(runs):
+        player.record(playerMove(player, bot, round, rng))
+        bot.record(botMove(bot, player, round, rng))
+        points = table[player.moves[:, round], bot.moves[:, round]]
+        player.score += points[:, 0]
+        bot.score += points[:, 1]
+        player.implementAdaptive(bot.moves[:, round])
+        bot.implementAdaptive(player.moves[:, round])
+
+    return PairingResult(playerStrategy, botStrategy, player, bot)
+
+def roundRobin(runs, repetitions, names=None, payoffs=PAYOFFS, seed=None, window=6, noise=None):
+    """ plays every pairing of the strategies, including each strategy against
+    itself, for the given number of repetitions. Returns the results keyed by
+    (player strategy, bot strategy) """
+    if names is None:
+        names = list(STRATEGIES)
+    rng = np.random.default_rng(seed)
+    results = {}
+    for i in range(len(names)):
+        for j in range(i, len(names)):
+            results[(names[i], names[j])] = playPairing(names[i], names[j], runs, repetitions, payoffs, rng,
+                                                        window, noise)
+    return results
+
+def scoreTable(results, names=None):
+    """ averages the results of a round robin into a table whose entry [i, j] is
+    the mean score strategy i earned against strategy j """
+    if names is None:
+        names = list(STRATEGIES)
+    index = {name: i for i, name in enumerate(names)}
+    table = np.zeros((len(names), len(names)))
+    for (playerStrategy, botStrategy), result in results.items():
+        i = index[playerStrategy]
+        j = index[botStrategy]
+        if i == j:
+            table[i, i] = (result.playerScores.mean() + result.botScores.mean()) / 2
+        else:
+            table[i, j] = result.playerScores.mean()
+            table[j, i] = result.botScores.mean()
+    return table